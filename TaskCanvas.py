@@ -469,6 +469,7 @@ def inject_hover_console_features(html: str, *, log=True) -> str:
   }
   function toShort(uid){
     if (!uid) return "";
+    if (typeof taskCmdId === 'function') return taskCmdId(uid);
     if (/^[0-9a-f]{6,8}$/i.test(uid)) return uid.slice(0,8);
     try{
       if (window.TASKS) for (var i=0;i<TASKS.length;i++) if (TASKS[i]?.uuid===uid) return TASKS[i].short || uid.slice(0,8);
@@ -690,6 +691,7 @@ def inject_hover_console_features(html: str, *, log=True) -> str:
                 return out;
               }
               function toShortId(x){
+                if (typeof taskCmdId === 'function') return taskCmdId(x);
                 try{
                   var n = document.querySelector('#builderStage [data-uuid="'+x+'"]');
                   if (n) return n.getAttribute('data-short') || String(x).slice(0,8);
@@ -843,6 +845,7 @@ def inject_multiline_add(html: str) -> str:
     // model
     window.TASKS.push(t);
     try{ window.TASK_BY_SHORT[t.short] = t; }catch(_){}
+    try{ searchIndexAdd(t); }catch(_){}
     // list
     try{ renderList(); }catch(_){}
     // builder + node enforcement
@@ -932,6 +935,7 @@ def inject_multiline_add(html: str) -> str:
         const t = makeNewTask(lines[i], project, tagsArr);
         window.TASKS.push(t);
         try{ window.TASK_BY_SHORT[t.short] = t; }catch(_){}
+        try{ searchIndexAdd(t); }catch(_){}
         try{ renderList(); }catch(_){}
         if (onCanvas){
           try{
@@ -1605,7 +1609,16 @@ def inject_actionable_beacon(html: str) -> str:
   function collectEdgeSets(){
     var havePrereq = Object.create(null), inChain = Object.create(null);
     function add(e){ if(!e) return; var f=e.from, t=e.to; if(f){havePrereq[f]=1; inChain[f]=1;} if(t){inChain[t]=1;} }
-    try{ (window.EXIST_EDGES||[]).forEach(add); }catch(_){}
+    try{
+      if (existEdgesPending()){   // placed nodes only, straight from the CSR rows
+        document.querySelectorAll('#builderStage .node[data-short]').forEach(function(nd){
+          var s = nd.getAttribute('data-short'), i = SHORT_INDEX[s];
+          if (i == null) return;
+          if (csrDeps(i).length){ havePrereq[s]=1; inChain[s]=1; }
+          if (csrParents(i).length) inChain[s]=1;
+        });
+      } else (window.EXIST_EDGES||[]).forEach(add);
+    }catch(_){}
     try{ (window.stagedAdd  ||[]).forEach(add); }catch(_){}
     return {havePrereq,inChain};
   }
@@ -1671,43 +1684,243 @@ OUT_HTML = Path.cwd() / "TaskCanvas.html"
 def eprint(*args):
     sys.stderr.write(" ".join(str(a) for a in args) + "\n"); sys.stderr.flush()
 
+# ======================= Profiling (--profile) =====================
+# Stage timings for main(): wall-clock spans (kept for the Chrome trace) and
+# summed-only durations (pipe wait, per-record normalization). Everything here
+# is a no-op unless --profile set PROFILE.
+
+PROFILE = None
+
+class _Profile:
+    """Collected spans and per-name totals; safe to use from run_queries' threads."""
+    def __init__(self):
+        import threading, time
+        self.clock, self.lock = time.perf_counter, threading.Lock()
+        self.t0 = self.clock()
+        self.spans = []      # (name, cat, start, dur, thread name, args)
+        self.totals = {}     # name → [cat, calls, seconds]
+
+    def add(self, name, dt, cat="stage", start=None, args=None):
+        import threading
+        with self.lock:
+            tot = self.totals.setdefault(name, [cat, 0, 0.0])
+            tot[1] += 1; tot[2] += dt
+            if start is not None:
+                self.spans.append((name, cat, start - self.t0, dt, threading.current_thread().name, args or {}))
+
+    def summary(self):
+        wall = self.clock() - self.t0
+        rows = [f"{'stage':<44}{'kind':<11}{'calls':>6}{'total ms':>11}{'% wall':>8}"]
+        for name, (cat, n, dt) in sorted(self.totals.items(), key=lambda kv: -kv[1][2]):
+            rows.append(f"{name[:43]:<44}{cat:<11}{n:>6}{dt * 1000:>11.1f}{dt / wall * 100:>7.1f}%")
+        rows.append(f"{'(wall)':<44}{'':<11}{'':>6}{wall * 1000:>11.1f}")
+        return "\n".join(rows)
+
+    def chrome_trace(self):
+        """Trace Event Format (about:tracing / Perfetto): one complete event per span."""
+        pid, tids, events = os.getpid(), {}, []
+        for name, cat, start, dur, thread, args in self.spans:
+            tid = tids.setdefault(thread, len(tids) + 1)
+            events.append({"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round(start * 1e6, 1), "dur": round(dur * 1e6, 1), "args": args})
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+                   for thread, tid in tids.items()]
+        totals = {name: {"kind": cat, "calls": n, "ms": round(dt * 1000, 3)} for name, (cat, n, dt) in self.totals.items()}
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"totals": totals}}
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.start = PROFILE.clock()
+        return self
+
+    def __exit__(self, *exc):
+        PROFILE.add(self.name, PROFILE.clock() - self.start, self.cat, self.start, self.args)
+
+class _NoSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+
+_NO_SPAN = _NoSpan()
+
+def profile_span(name, cat="stage", **args):
+    """`with profile_span("build_payload"):` — times the block under --profile."""
+    return _Span(name, cat, args) if PROFILE is not None else _NO_SPAN
+
+class _TimedReader:
+    """Pipe wrapper summing the time read() blocks on the child process."""
+    def __init__(self, stream, name):
+        self.stream, self.name = stream, name
+
+    def read(self, n=-1):
+        t0 = PROFILE.clock()
+        data = self.stream.read(n)
+        PROFILE.add(self.name, PROFILE.clock() - t0, "wait")
+        return data
+
+def _cmd_label(cmd):
+    """'task status:pending export' — argv without rc.* overrides, for profile rows."""
+    return " ".join(a for a in cmd if not a.startswith("rc."))[:60]
+
+def write_profile(path):
+    """Print the stage table to stderr and write the Chrome trace JSON."""
+    if PROFILE is None:
+        return
+    eprint("[TaskCanvas] Profile:\n" + PROFILE.summary())
+    try:
+        Path(path).write_text(json.dumps(PROFILE.chrome_trace()), encoding="utf-8")
+        eprint(f"[TaskCanvas] Wrote trace {path} (open in about:tracing or ui.perfetto.dev)")
+    except OSError as e:
+        eprint(f"[TaskCanvas] trace write failed: {e}")
+
 def run_quiet(cmd, timeout=30):
     try:
-        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout, check=False, text=True)
+        with profile_span(_cmd_label(cmd), "subprocess"):
+            p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout, check=False, text=True)
         return p.returncode, p.stdout, p.stderr
     except Exception as e:
         return 1, "", str(e)
 
+def _iter_task_export(stream, chunk_size=1 << 16):
+    """
+    Yield task records from a text stream as Taskwarrior writes them.
+    Handles both the JSON-array form (rc.json.array=on) and JSON lines, skips
+    "Configuration override" chatter, and never holds more than one chunk plus
+    the record being decoded.
+    """
+    dec = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    while True:
+        # Drop separators / whitespace between records
+        n = len(buf)
+        while pos < n and buf[pos] in " \t\r\n[],":
+            pos += 1
+        if pos >= n:
+            if eof:
+                return
+            buf, pos = stream.read(chunk_size), 0
+            eof = not buf
+            continue
+        if buf[pos] == "{":
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+            except ValueError:
+                if not eof:
+                    more = stream.read(chunk_size)
+                    buf, pos, eof = buf[pos:] + more, 0, not more
+                    continue
+                obj, end = None, buf.find("\n", pos)   # malformed tail: skip the line
+                end = n if end < 0 else end
+            pos = end
+            if isinstance(obj, dict):
+                if "uuid" not in obj and isinstance(obj.get("data") or obj.get("rows"), list):
+                    yield from (r for r in (obj.get("data") or obj.get("rows")) if isinstance(r, dict))
+                else:
+                    yield obj
+            continue
+        # Anything else is a non-JSON line (e.g. "Configuration override ...")
+        nl = buf.find("\n", pos)
+        if nl < 0 and not eof:
+            more = stream.read(chunk_size)
+            buf, pos, eof = buf[pos:] + more, 0, not more
+            continue
+        pos = n if nl < 0 else nl + 1
+
 def _parse_task_export(raw: str):
     if not raw: return []
-    lines=[]
-    for ln in raw.splitlines():
-        s=ln.strip()
-        if not s or s.startswith("Configuration override "): continue
-        lines.append(ln)
-    txt="\n".join(lines).strip()
-    if not txt: return []
+    import io
+    with profile_span("_parse_task_export"):
+        return list(_iter_task_export(io.StringIO(raw)))
+
+def _stream_task_export(cmd, timeout=30):
+    """Run an export command and yield records while it is still producing output."""
+    import threading
     try:
-        obj=json.loads(txt)
-        if isinstance(obj, list): return obj
-        if isinstance(obj, dict):
-            if isinstance(obj.get("data"), list): return obj["data"]
-            if isinstance(obj.get("rows"), list): return obj["rows"]
-    except Exception: pass
-    rows=[]
-    for ln in txt.splitlines():
-        s=ln.strip()
-        if not s or not (s.startswith("{") and s.endswith("}")): continue
-        try: rows.append(json.loads(s))
-        except Exception: pass
-    return rows
-
-def fetch_tasks(filter_str=None, timeout=30):
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                             text=True, encoding="utf-8", errors="replace")
+    except OSError as e:
+        eprint(f"[TaskCanvas] {cmd[0]}: {e}")
+        return
+    timer = threading.Timer(timeout, p.kill)
+    timer.daemon = True
+    timer.start()
+    finished = False
+    label = _cmd_label(cmd)
+    with profile_span(label, "subprocess"):
+        try:
+            yield from _iter_task_export(p.stdout if PROFILE is None else _TimedReader(p.stdout, "pipe wait: " + label))
+            finished = True
+        finally:
+            timer.cancel()
+            if not finished and p.poll() is None:
+                p.kill()
+            p.stdout.close()
+            with profile_span("wait: " + label, "wait"):
+                p.wait()
+
+def _heavy_fields(r, fields):
+    """Selected heavy fields of an exported record (annotations reduced to their text)."""
+    out = {}
+    for k in fields:
+        v = r.get(k)
+        if v is None or v == "" or v == []:
+            continue
+        if k == "annotations" and isinstance(v, list):
+            v = [a.get("description", "") if isinstance(a, dict) else str(a) for a in v]
+        out[k] = v
+    return out
+
+def _normalize_task(r, fields=None):
     """
-    If filter_str is None → equivalent to 'task status:pending export'
-    Else → runs 'task <filter_str> export'
-    Returns list of dicts with fields: uuid, short, desc, project, tags, depends, due
+    Reduce one exported record to the fields TaskCanvas uses (None if it has no uuid).
+    `fields` (e.g. ["annotations", "priority", "urgency", <UDAs>]) are kept under "fields".
     """
+    uuid = r.get("uuid") or r.get("id") or ""
+    if not uuid:
+        return None
+    if not isinstance(uuid, str):
+        uuid = str(uuid)
+    desc = r.get("description") or r.get("desc") or "(no description)"
+    project = r.get("project") or "(no project)"
+    tags = r.get("tags") or []
+    if isinstance(tags, str):
+        tags = [t for t in re.split(r"[,\s]+", tags) if t]
+    depends = r.get("depends") or r.get("dependencies") or []
+    if isinstance(depends, str):
+        depends = [d for d in re.split(r"[,\s]+", depends) if d]
+    due = r.get("due")
+    t = {
+        "uuid": uuid,
+        "short": uuid.replace("-", "")[:8],
+        "desc": desc,
+        "project": project,
+        "tags": tags,
+        "depends": depends,
+        "due": due,
+    }
+    if fields:
+        t["fields"] = _heavy_fields(r, fields)
+    return t
+
+def _normalize_records(records, fields=None):
+    """_normalize_task over an iterable, dropping records without a uuid (time summed under --profile)."""
+    if PROFILE is None:
+        return [t for t in (_normalize_task(r, fields) for r in records) if t]
+    out, busy, clock = [], 0.0, PROFILE.clock
+    for r in records:
+        t0 = clock()
+        t = _normalize_task(r, fields)
+        busy += clock() - t0
+        if t:
+            out.append(t)
+    PROFILE.add("normalize", busy)
+    return out
+
+def _export_cmd(filter_str=None):
     base = ["task",
             "rc.confirmation=off",
             "rc.dependency.confirmation=off",
@@ -1719,89 +1932,1186 @@ def fetch_tasks(filter_str=None, timeout=30):
     else:
         base += ["status:pending"]
 
-    base += ["export"]
+    return base + ["export"]
 
-    # Try with rc flags first; fall back to a plain export if needed
+def fetch_tasks(filter_str=None, timeout=30, fields=None):
+    """
+    If filter_str is None → equivalent to 'task status:pending export'
+    Else → runs 'task <filter_str> export'
+    Returns list of dicts with fields: uuid, short, desc, project, tags, depends, due
+    Records are decoded and normalized as the export streams in.
+    """
+    base = _export_cmd(filter_str)
+    tasks = _normalize_records(_stream_task_export(base, timeout), fields)
+    if not tasks:
+        # fallback to default task export (older Taskwarrior / rc mismatch)
+        tasks = _normalize_records(_stream_task_export(["task", "export"], timeout), fields)
+
+    tasks.sort(key=lambda t: (t["project"], t["desc"]))
+
+    eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (filter: {filter_str!r})")
+
+    return tasks
+
+
+# ======================= Bulk apply via `task import` =====================
+# The console's commands (copied with "Copy commands") folded into one JSON
+# document: the raw pending export is the merge base, each line edits its
+# record(s), and a single `task import` applies the whole session.
+
+# Built-in date attributes (also converted from the data stores' epoch strings by _record_from_kv)
+_TW_DATE_ATTRS = ("due", "wait", "scheduled", "until", "start", "end", "entry", "modified")
+
+def _tw_now():
+    from datetime import datetime, timezone
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _tw_date_value(v, cache):
+    """Date attribute value → export format (UTC); anything but plain ISO goes through `task calc` once."""
+    from datetime import datetime, timezone
+    if re.fullmatch(r"\d{8}T\d{6}Z", v):
+        return v
+    if v not in cache:
+        out = v
+        if not re.fullmatch(r"\d{4}-\d\d-\d\d(T\d\d:\d\d(:\d\d)?)?", v):
+            rc, out, _ = run_quiet(["task", "rc.verbose=nothing", "rc.confirmation=off", "calc", v])
+            out = out.strip() if rc == 0 else ""
+        try:
+            cache[v] = datetime.fromisoformat(out).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        except ValueError:
+            cache[v] = None
+    return cache[v]
+
+def _command_lines(text):
+    """Console text → list of token lists, one per `task …` line (timestamps / descriptions before ' > task ' dropped)."""
+    out = []
+    for ln in text.replace("\r\n", "\n").replace("\\n", "\n").split("\n"):
+        ln = ln.strip()
+        j = ln.find(" > task ")
+        if j != -1:
+            ln = ln[j + 3:]
+        if ln.startswith("$ "):
+            ln = ln[2:]
+        if not ln or ln.startswith("#"):
+            continue
+        try:
+            toks = shlex.split(ln)
+        except ValueError:                      # unbalanced quote in a description
+            toks = ln.split()
+        out.append((ln, toks))
+    return out
+
+def build_import_document(text, base):
+    """
+    Fold staged console commands into `task import` records.
+    base: {uuid: raw export record} (pending tasks). Supported lines:
+      task add <desc> [project:P] [+tag] [depends:ID,…] [attr:value]
+      task ID modify [words…] [project:P] [+tag|-tag] [depends:[-]ID,…] [attr:value]
+      task ID done | task ID delete
+    IDs may be full uuids or unique uuid prefixes (the canvas' shorts).
+    Returns (records, unsupported_lines).
+    """
+    import uuid as uuidlib
+    hexes = {u.replace("-", ""): u for u in base}
+    known = {k for r in base.values() for k in r}          # includes UDAs in use
+    dates, changed, new, unsupported = {}, {}, [], []
+    now = _tw_now()
+
+    def resolve(tok):
+        if tok in base:
+            return tok
+        h = tok.replace("-", "").lower()
+        hits = [u for x, u in hexes.items() if x.startswith(h)] if len(h) >= 6 else []
+        return hits[0] if len(hits) == 1 else None
+
+    def record(u):
+        if u not in changed:
+            changed[u] = dict(base[u])
+        return changed[u]
+
+    def attr(name):
+        try:
+            return _resolve_attr(name)
+        except _FilterUnsupported:
+            return name if name in known else None
+
+    def apply_mods(rec, mods):
+        """Apply modification tokens to rec; False if one isn't understood."""
+        words = []
+        for tok in mods:
+            m = re.match(r"^([A-Za-z_][\w]*):(.*)$", tok)
+            key = attr(m.group(1)) if m else None
+            if m and key is None:               # "re: taxes" — just a word
+                m = None
+            if tok[:1] in "+-" and len(tok) > 1 and not m:
+                tags = [t for t in (rec.get("tags") or []) if t != tok[1:]]
+                if tok[0] == "+":
+                    tags.append(tok[1:])
+                rec["tags"] = tags
+            elif m and key == "depends":
+                deps = rec.get("depends") or []
+                was_str = isinstance(deps, str)
+                deps = [d for d in (deps.split(",") if was_str else deps) if d]
+                for ref in (x for x in m.group(2).split(",") if x):
+                    drop = ref.startswith("-")
+                    target = resolve(ref.lstrip("-+"))
+                    if target is None:
+                        return False
+                    deps = [d for d in deps if d != target] + ([] if drop else [target])
+                rec["depends"] = ",".join(deps) if was_str else deps
+            elif m:
+                val = m.group(2)
+                if key in ("uuid", "id", "urgency", "entry", "modified", "mask", "imask", "parent"):
+                    return False
+                if not val:
+                    rec.pop(key, None)
+                elif key == "tags":
+                    rec["tags"] = [t for t in val.split(",") if t]
+                elif key in _TW_DATE_ATTRS:
+                    val = _tw_date_value(val, dates)
+                    if val is None:
+                        return False
+                    rec[key] = val
+                else:
+                    rec[key] = val
+            else:
+                words.append(tok)
+        if words:
+            rec["description"] = " ".join(words)
+        return True
+
+    for line, toks in _command_lines(text):
+        if len(toks) < 2 or toks[0] != "task":
+            unsupported.append(line); continue
+        if toks[1] == "add":
+            rec = {"uuid": str(uuidlib.uuid4()), "status": "pending", "entry": now, "description": ""}
+            if apply_mods(rec, toks[2:]) and rec["description"]:
+                new.append(rec)
+            else:
+                unsupported.append(line)
+            continue
+        u = resolve(toks[1])
+        verb = toks[2] if len(toks) > 2 else ""
+        if u is None or verb not in ("modify", "mod", "done", "delete"):
+            unsupported.append(line); continue
+        rec = record(u)
+        if verb in ("done", "delete"):
+            rec["status"] = "completed" if verb == "done" else "deleted"
+            rec["end"] = now
+        else:
+            snapshot = dict(rec)
+            if not apply_mods(rec, toks[3:]):
+                rec.clear(); rec.update(snapshot)
+                unsupported.append(line)
+    for rec in changed.values():
+        rec["modified"] = now
+    records = [{k: v for k, v in r.items() if k not in ("id", "urgency")}   # computed, not importable
+               for u, r in changed.items() if r != base[u]] + new
+    return records, unsupported
+
+def apply_commands(text, dry_run=False, timeout=60):
+    """
+    --apply: fold the staged commands into one import document and hand it to a
+    single `task import` (or print it with --dry-run). Returns an exit status.
+    """
+    import tempfile
+    base = {r["uuid"]: r for r in _stream_task_export(_export_cmd(None), timeout) if r.get("uuid")}
+    records, unsupported = build_import_document(text, base)
+    doc = json.dumps(records, ensure_ascii=False, indent=1)
+    if unsupported:
+        eprint("[TaskCanvas] Not covered by the import (run these yourself):")
+        for ln in unsupported:
+            eprint("  " + ln)
+    if dry_run:
+        print(doc)
+        return 0
+    if not records:
+        eprint("[TaskCanvas] Nothing to import.")
+        return 0
+    with tempfile.NamedTemporaryFile("w", suffix=".json", prefix="taskcanvas-import-",
+                                     encoding="utf-8", delete=False) as fh:
+        fh.write(doc)
+    try:
+        rc, out, err = run_quiet(["task", "rc.confirmation=off", "rc.dependency.confirmation=off",
+                                  "rc.verbose=nothing", "import", fh.name], timeout)
+    finally:
+        os.unlink(fh.name)
+    if rc != 0:
+        eprint(f"[TaskCanvas] task import failed: {(err or out).strip()}")
+        return rc
+    n_new = sum(1 for r in records if r["uuid"] not in base)
+    eprint(f"[TaskCanvas] Applied {len(records) - n_new} changed and {n_new} new task(s) with one `task import`")
+    return 0
+
+
+# ======================= Direct data-store backend (read-only) =====================
+# Reads pending tasks without spawning `task` (no taskrc parsing, hooks, GC or
+# recurrence). Produces the same records as fetch_tasks(None); returns None when
+# the store can't be read so callers fall back to the CLI export.
+
+def _epoch_to_tw(v):
+    """'1759320000' → '20251001T120000Z' (the export date format)."""
+    from datetime import datetime, timezone
+    try:
+        return datetime.fromtimestamp(int(float(v)), timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+def _is_pending(status, wait, now):
+    """status:pending as the CLI reports it: waiting tasks (future wait) excluded."""
+    if status != "pending":
+        return False
+    try:
+        return not wait or float(wait) <= now
+    except ValueError:
+        return True
+
+def _record_from_kv(uuid, kv):
+    """
+    Export-shaped record from a flat key/value task (TaskChampion or FF4 line).
+    Dates are converted to the export format; there is no urgency (Taskwarrior
+    computes it at export time).
+    """
+    tags = [k[4:] for k in kv if k.startswith("tag_")]
+    if not tags and kv.get("tags"):
+        tags = [t for t in kv["tags"].split(",") if t]
+    deps = [k[4:] for k in kv if k.startswith("dep_")]
+    if not deps and kv.get("depends"):
+        deps = [d for d in kv["depends"].split(",") if d]
+    rec = {k: v for k, v in kv.items()
+           if not k.startswith(("tag_", "dep_", "annotation_")) and k not in ("tags", "depends")}
+    for k in _TW_DATE_ATTRS:
+        if rec.get(k):
+            rec[k] = _epoch_to_tw(rec[k])
+    rec.update({
+        "uuid": uuid,
+        "tags": tags,
+        "depends": deps,
+        "due": rec.get("due"),
+        "annotations": [kv[k] for k in sorted(k for k in kv if k.startswith("annotation_"))],
+    })
+    return rec
+
+def _read_taskchampion(db_path, now):
+    import sqlite3
+    con = sqlite3.connect(db_path.as_uri() + "?mode=ro", uri=True)
     try:
-        rc, out, err = run_quiet(base, timeout)
-    except NameError:
-        # If run_quiet isn't available in this scope, fallback to subprocess
-        import subprocess
+        # serde_json writes compact JSON, so this substring test skips completed/deleted rows cheaply
+        cur = con.execute("SELECT uuid, data FROM tasks WHERE instr(data, '\"status\":\"pending\"') > 0")
+        out = []
+        for uuid, data in cur:
+            kv = json.loads(data)
+            if _is_pending(kv.get("status"), kv.get("wait"), now):
+                out.append(_record_from_kv(uuid, kv))
+        return out
+    finally:
+        con.close()
+
+_FF4_ATTR = re.compile(r'([^\s:\[\]]+):"((?:[^"\\]|\\.)*)"')
+
+def _ff4_value(v):
+    v = v.replace("&open;", "[").replace("&close;", "]").replace("&dquot;", '"')
+    if "\\" in v:
         try:
-            out = subprocess.check_output(base, stderr=subprocess.STDOUT, timeout=timeout).decode("utf-8", "replace")
-        except Exception:
-            out = ""
-        rc = 0
-        err = ""
-
-    rows = _parse_task_export(out)
-    if not rows:
-        # fallback to default task export (older Taskwarrior / rc mismatch)
+            return json.loads('"' + v + '"')
+        except ValueError:
+            pass
+    return v
+
+def _read_pending_data(path, now):
+    out = []
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for ln in fh:
+            if 'status:"pending"' not in ln:
+                continue
+            kv = {k: _ff4_value(v) for k, v in _FF4_ATTR.findall(ln)}
+            if kv.get("uuid") and _is_pending(kv.get("status"), kv.get("wait"), now):
+                out.append(_record_from_kv(kv["uuid"], kv))
+    return out
+
+def fetch_tasks_direct(fields=None):
+    """
+    Pending tasks read straight from the data directory: TW3's TaskChampion
+    replica (taskchampion.sqlite3) or TW2's pending.data. None if unavailable.
+    """
+    import time
+    data_dir, now = _tw_data_dir(), time.time()
+    try:
+        db = data_dir / "taskchampion.sqlite3"
+        if db.is_file():
+            rows = _read_taskchampion(db, now)
+        elif (data_dir / "pending.data").is_file():
+            rows = _read_pending_data(data_dir / "pending.data", now)
+        else:
+            eprint(f"[TaskCanvas] direct backend: no task data in {data_dir}")
+            return None
+    except Exception as e:
+        eprint(f"[TaskCanvas] direct backend failed: {e}")
+        return None
+    tasks = _normalize_records(rows, fields)
+    tasks.sort(key=lambda t: (t["project"], t["desc"]))
+    eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (direct: {data_dir})")
+    return tasks
+
+def fetch_pending(backend="cli", timeout=30, fields=None):
+    """All pending tasks via the chosen backend; 'direct' falls back to the CLI export."""
+    if backend == "delta":
+        return fetch_tasks_delta(fields, timeout)
+    if backend == "direct":
+        tasks = fetch_tasks_direct(fields)
+        if tasks:
+            return tasks
+        eprint("[TaskCanvas] direct backend unavailable; falling back to 'task export'")
+    return fetch_tasks(None, timeout, fields)
+
+def run_queries(queries):
+    """
+    Run independent Taskwarrior queries {name: (fn, *args)} on a thread pool
+    (each spends its time waiting on its own `task` process) and return
+    {name: result}. Logs wall-clock vs summed time when more than one ran.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    def timed(fn, *args):
+        t0 = time.perf_counter()
+        return fn(*args), time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if len(queries) == 1:
+        (name, (fn, *args)), = queries.items()
+        return {name: fn(*args)}
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futs = {name: pool.submit(timed, fn, *args) for name, (fn, *args) in queries.items()}
+        done = {name: f.result() for name, f in futs.items()}
+    wall = time.perf_counter() - t0
+    summed = sum(dt for _, dt in done.values())
+    parts = ", ".join(f"{name} {dt:.2f}s" for name, (_, dt) in done.items())
+    eprint(f"[TaskCanvas] Queries: {parts} — wall {wall:.2f}s vs summed {summed:.2f}s")
+    return {name: res for name, (res, _) in done.items()}
+
+def _extract_backend_arg(argv):
+    """Parse --backend=cli|direct|delta (or --backend VALUE), return (backend, remaining_args)."""
+    backend, out, skip = "cli", [], False
+    for i, a in enumerate(argv):
+        if skip:
+            skip = False
+            continue
+        if a == "--backend":
+            if i + 1 < len(argv):
+                backend = argv[i + 1]; skip = True
+        elif a.startswith("--backend="):
+            backend = a.split("=", 1)[1]
+        else:
+            out.append(a)
+    if backend not in ("cli", "direct", "delta"):
+        eprint(f"[TaskCanvas] unknown backend {backend!r}; using 'cli'")
+        backend = "cli"
+    return backend, out
+
+
+# ======================= Export cache (keyed on data-file state) =====================
+
+CACHE_VERSION = 1
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or (Path.home() / ".cache")) / "taskcanvas"
+
+def _tw_rc_path():
+    """Locate the taskrc the `task` binary would read ($TASKRC, ~/.taskrc, XDG)."""
+    env = os.environ.get("TASKRC")
+    if env:
+        return Path(env).expanduser()
+    legacy = Path.home() / ".taskrc"
+    if legacy.is_file():
+        return legacy
+    xdg = Path(os.environ.get("XDG_CONFIG_HOME") or (Path.home() / ".config")) / "task" / "taskrc"
+    return xdg if xdg.is_file() else legacy
+
+def _taskrc_get(rc_path, key):
+    """Read a plain `key=value` setting from a taskrc (no includes, last one wins)."""
+    val = None
+    try:
+        with open(rc_path, encoding="utf-8", errors="replace") as fh:
+            for ln in fh:
+                s = ln.split("#", 1)[0].strip()
+                if "=" not in s: continue
+                k, v = s.split("=", 1)
+                if k.strip() == key:
+                    val = v.strip()
+    except OSError:
+        pass
+    return val
+
+def _tw_data_dir():
+    """Taskwarrior data directory: $TASKDATA, then rc data.location, then ~/.task."""
+    env = os.environ.get("TASKDATA")
+    if env:
+        return Path(env).expanduser()
+    loc = _taskrc_get(_tw_rc_path(), "data.location")
+    if loc:
+        return Path(loc).expanduser()
+    return Path.home() / ".task"
+
+# TW2 keeps pending/completed.data; TW3 keeps a TaskChampion SQLite replica (+WAL).
+_TW_DATA_FILES = ("pending.data", "completed.data",
+                  "taskchampion.sqlite3", "taskchampion.sqlite3-wal")
+
+def _tw_fingerprint():
+    """
+    Cheap fingerprint of the Taskwarrior state: size + mtime of the data files
+    and the taskrc. Any `task` write changes at least one of them.
+    None when no data file is found where we look (data.location set through an
+    include or rc override, XDG data dir, ...): nothing would ever change the key.
+    """
+    data_dir = _tw_data_dir()
+    files = [(name, data_dir / name) for name in _TW_DATA_FILES]
+    files.append(("taskrc", _tw_rc_path()))
+    parts = [f"v{CACHE_VERSION}", str(data_dir.resolve())]
+    found = False
+    for name, p in files:
+        try:
+            st = p.stat()
+            parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+            found = found or name != "taskrc"
+        except OSError:
+            parts.append(f"{name}:-")
+    return "|".join(parts) if found else None
+
+def _cache_path():
+    import hashlib
+    tag = hashlib.sha1(str(_tw_data_dir().resolve()).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"export-{tag}.json"
+
+def load_cached_tasks(key):
+    """Return the cached normalized tasks if the cache was written for `key`, else None."""
+    try:
+        with open(_cache_path(), encoding="utf-8") as fh:
+            obj = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(obj, dict) or obj.get("key") != key or not isinstance(obj.get("tasks"), list):
+        return None
+    return obj["tasks"]
+
+def save_cached_tasks(key, tasks):
+    """Persist normalized tasks atomically (temp file + rename)."""
+    path = _cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"key": key, "tasks": tasks}, fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        eprint(f"[TaskCanvas] cache write failed: {e}")
+
+def clear_cache():
+    """Remove every TaskCanvas cache file (exports, hook snapshots, page shells); returns how many were deleted."""
+    n = 0
+    for p in [*CACHE_DIR.glob("export-*.json"), *CACHE_DIR.glob("hook-*.json"),
+              *CACHE_DIR.glob("delta-*.json"), *CACHE_DIR.glob("shell-*.json")]:
         try:
-            rc2, out2, err2 = run_quiet(["task", "export"], timeout)
-            rows = _parse_task_export(out2)
-        except NameError:
-            import subprocess
+            p.unlink(); n += 1
+        except OSError:
+            pass
+    return n
+
+def fetch_tasks_cached(use_cache=True, timeout=30, backend="cli", fields=None):
+    """
+    All pending tasks (same records as fetch_tasks(None)), served from the
+    on-disk cache when the data-file fingerprint is unchanged, or from the
+    hook snapshot when the --install-hook hooks are in place.
+    """
+    if not use_cache:
+        return fetch_pending(backend, timeout, fields)
+    tasks = load_hook_snapshot(fields)
+    if tasks is not None:
+        return tasks
+    # Key is taken *before* exporting: a write racing the export just forces a refetch next run.
+    fp = _tw_fingerprint()
+    if fp is None:
+        eprint("[TaskCanvas] No data files found to fingerprint; export cache skipped")
+        return fetch_pending(backend, timeout, fields)
+    # Backends differ in what they return (direct has no urgency), fields in the extra columns
+    key = fp + f"|backend:{backend}" + (f"|fields:{','.join(fields)}" if fields else "")
+    tasks = load_cached_tasks(key)
+    if tasks is not None:
+        eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (cache hit)")
+        return tasks
+    tasks = fetch_pending(backend, timeout, fields)
+    if tasks:
+        save_cached_tasks(key, tasks)
+    return tasks
+
+def _extract_cache_args(argv):
+    """Parse --no-cache / --clear-cache, return (use_cache, clear, remaining_args)."""
+    use_cache, clear, out = True, False, []
+    for a in argv:
+        if a == "--no-cache":
+            use_cache = False
+        elif a == "--clear-cache":
+            clear = True
+        else:
+            out.append(a)
+    return use_cache, clear, out
+
+
+# ======================= Hook-maintained snapshot =====================
+# Optional on-add/on-modify hooks (--install-hook) append every changed task to
+# a journal; loading folds the journal into a normalized snapshot instead of
+# exporting. The hooks are two-line sh scripts (no Python start-up inside every
+# `task` command). A digest of the store (pending count + newest `modified`)
+# and a maximum age catch changes that bypass hooks (sync, undo, recurrence).
+
+HOOK_NAME = "zz-taskcanvas"            # hooks run in name order: see the final record
+HOOK_MAX_AGE = 24 * 3600
+
+_HOOK_SH = {
+    "on-add": """#!/bin/sh
+# TaskCanvas snapshot journal (python3 TaskCanvas.py --uninstall-hook removes it)
+IFS= read -r new
+printf '%s\\n' "$new"
+printf '%s\\n' "$new" >> {journal} 2>/dev/null
+exit 0
+""",
+    "on-modify": """#!/bin/sh
+# TaskCanvas snapshot journal (python3 TaskCanvas.py --uninstall-hook removes it)
+IFS= read -r old
+IFS= read -r new
+printf '%s\\n' "$new"
+printf '%s\\n' "$new" >> {journal} 2>/dev/null
+exit 0
+""",
+}
+
+def _hook_dir():
+    loc = _taskrc_get(_tw_rc_path(), "hooks.location")
+    return Path(loc).expanduser() if loc else _tw_data_dir() / "hooks"
+
+def _hook_paths():
+    """(snapshot, journal) files for the current data directory."""
+    stem = _cache_path().stem.replace("export-", "hook-", 1)
+    return CACHE_DIR / f"{stem}.json", CACHE_DIR / f"{stem}.journal"
+
+def hook_installed():
+    return all((_hook_dir() / f"{ev}.{HOOK_NAME}").is_file() for ev in _HOOK_SH)
+
+def _tw_epoch(v):
+    """Export timestamp or epoch string → int epoch (0 if missing/unparseable)."""
+    import calendar
+    if not v:
+        return 0
+    if isinstance(v, (int, float)) or str(v).isdigit():
+        return int(v)
+    d = _tw_date(v)
+    return calendar.timegm(d.utctimetuple()) if d else 0
+
+def _hook_entry(r, fields):
+    """(normalized task, modified epoch, wait epoch) for a pending/waiting record, else None."""
+    if r.get("status") not in ("pending", "waiting"):
+        return None
+    t = _normalize_task(r, fields)
+    return t and (t, _tw_epoch(r.get("modified")), _tw_epoch(r.get("wait")))
+
+def _snapshot_digest(entries):
+    return [len(entries), max((e[1] for e in entries.values()), default=0)]
+
+def _store_digest():
+    """[pending+waiting count, newest modified epoch] read from the data store, or None."""
+    data_dir = _tw_data_dir()
+    try:
+        db = data_dir / "taskchampion.sqlite3"
+        if db.is_file():
+            import sqlite3
+            con = sqlite3.connect(db.as_uri() + "?mode=ro", uri=True)
             try:
-                out2 = subprocess.check_output(["task", "export"], stderr=subprocess.STDOUT, timeout=timeout).decode("utf-8","replace")
-            except Exception:
-                out2 = ""
-            rows = _parse_task_export(out2)
-
-    tasks = []
-    for r in rows or []:
-        uuid = r.get("uuid") or r.get("id") or ""
-        if not uuid:
+                n, m = con.execute("SELECT count(*), max(CAST(json_extract(data, '$.modified') AS INTEGER)) FROM tasks"
+                                   " WHERE json_extract(data, '$.status') IN ('pending', 'waiting')").fetchone()
+            finally:
+                con.close()
+            return [n, m or 0]
+        path = data_dir / "pending.data"
+        if not path.is_file():
+            return None
+        n = m = 0
+        mod_re = re.compile(r'\bmodified:"(\d+)"')
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            for ln in fh:
+                if 'status:"pending"' in ln or 'status:"waiting"' in ln:
+                    n += 1
+                    hit = mod_re.search(ln)
+                    m = max(m, int(hit.group(1)) if hit else 0)
+        return [n, m]
+    except Exception as e:
+        eprint(f"[TaskCanvas] hook snapshot: store check failed: {e}")
+        return None
+
+def _merge_records(entries, records, fields):
+    """Apply exported/hook records to a snapshot's entries (closed tasks drop out); returns how many."""
+    n = 0
+    for r in records:
+        u = r.get("uuid")
+        if not u:
             continue
-        desc = r.get("description") or r.get("desc") or "(no description)"
-        project = r.get("project") or "(no project)"
-        tags = r.get("tags") or []
-        if isinstance(tags, str):
-            tags = [t for t in re.split(r"[,\s]+", tags) if t]
-        depends = r.get("depends") or r.get("dependencies") or []
-        if isinstance(depends, str):
-            depends = [d for d in re.split(r"[,\s]+", depends) if d]
-        due = r.get("due")
-        tasks.append({
-            "uuid": uuid,
-            "short": uuid.replace("-", "")[:8],
-            "desc": desc,
-            "project": project,
-            "tags": tags,
-            "depends": depends,
-            "due": due,
-        })
-
+        e = _hook_entry(r, fields)
+        if e: entries[u] = e
+        else: entries.pop(u, None)
+        n += 1
+    return n
+
+def _read_snapshot(path, fields):
+    """Stored snapshot dict if it's for this CACHE_VERSION and --fields, else None."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            obj = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(obj, dict) or obj.get("version") != CACHE_VERSION or obj.get("fields") != fields:
+        return None
+    return obj
+
+def _snapshot_tasks(entries, now):
+    """Entries → fetch_tasks(None)-shaped list: waiting tasks whose wait hasn't passed are left out."""
+    tasks = [e[0] for e in entries.values() if not e[2] or e[2] <= now]
     tasks.sort(key=lambda t: (t["project"], t["desc"]))
+    return tasks
 
+_OPEN_FILTER = "( status:pending or status:waiting )"
+
+def _save_snapshot(path, entries, fields, built, **extra):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": CACHE_VERSION, "fields": fields, "built": built, **extra, "entries": entries},
+                      fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        eprint(f"[TaskCanvas] snapshot write failed: {e}")
+
+def rebuild_hook_snapshot(fields=None, timeout=60):
+    """Full export of pending + waiting tasks into a fresh snapshot; journal so far is discarded."""
+    import time
+    snap, journal = _hook_paths()
+    stale = journal.with_name(journal.name + f".{os.getpid()}")
     try:
-        eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (filter: {filter_str!r})")
-    except NameError:
-        print(f"[TaskCanvas] Loaded tasks: {len(tasks)} (filter: {filter_str!r})")
+        os.replace(journal, stale)      # appends from now on land in a new journal and are folded next time
+    except OSError:
+        stale = None
+    built, entries = int(time.time()), {}
+    _merge_records(entries, _stream_task_export(_export_cmd(_OPEN_FILTER), timeout), fields)
+    _save_snapshot(snap, entries, list(fields or []), built)
+    if stale:
+        stale.unlink(missing_ok=True)
+    eprint(f"[TaskCanvas] hook snapshot rebuilt from export: {len(entries)} task(s)")
+    return entries
+
+def load_hook_snapshot(fields=None):
+    """
+    Pending tasks (as fetch_tasks(None)) from the hook snapshot plus its journal,
+    compacting the journal into the snapshot. None when the hooks aren't installed.
+    """
+    import time
+    if not hook_installed():
+        return None
+    snap, journal = _hook_paths()
+    fields = list(fields or [])
+    obj, now = _read_snapshot(snap, fields), time.time()
+    if obj is None or now - obj.get("built", 0) > HOOK_MAX_AGE:
+        entries = rebuild_hook_snapshot(fields)
+    else:
+        entries = obj["entries"]
+        folding = journal.with_name(journal.name + f".{os.getpid()}")
+        try:
+            os.replace(journal, folding)
+        except OSError:
+            folding = None
+        if folding:
+            with open(folding, encoding="utf-8", errors="replace") as fh:
+                n = _merge_records(entries, _iter_task_export(fh), fields)
+        digest = _store_digest()
+        if digest is not None and digest != _snapshot_digest(entries):
+            eprint(f"[TaskCanvas] hook snapshot drifted from the store ({_snapshot_digest(entries)} vs {digest}); rebuilding")
+            entries = rebuild_hook_snapshot(fields)
+        elif folding:
+            _save_snapshot(snap, entries, fields, obj["built"])
+            eprint(f"[TaskCanvas] hook snapshot: folded {n} journal record(s)")
+        if folding:
+            folding.unlink(missing_ok=True)
+    tasks = _snapshot_tasks(entries, now)
+    eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (hook snapshot)")
+    return tasks
 
+def install_hook(remove=False):
+    """Write (or remove) the journal hooks in the Taskwarrior hooks directory."""
+    hook_dir = _hook_dir()
+    snap, journal = _hook_paths()
+    for ev, body in _HOOK_SH.items():
+        path = hook_dir / f"{ev}.{HOOK_NAME}"
+        if remove:
+            path.unlink(missing_ok=True)
+            continue
+        hook_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(body.replace("{journal}", shlex.quote(str(journal))), encoding="utf-8")
+        path.chmod(0o755)
+    if remove:
+        for p in (snap, journal):
+            p.unlink(missing_ok=True)
+        eprint(f"[TaskCanvas] Removed hooks from {hook_dir}")
+        return
+    journal.parent.mkdir(parents=True, exist_ok=True)
+    eprint(f"[TaskCanvas] Installed on-add/on-modify hooks in {hook_dir}")
+    rebuild_hook_snapshot()
+
+
+# ======================= Delta export (modified.after) =====================
+# --backend=delta keeps the same kind of snapshot with the time of its last
+# sync and only exports tasks modified since then (any status). Purged tasks,
+# `task undo` and synced changes with older timestamps are caught by the same
+# store digest the hook snapshot uses, and by a full re-export once a day.
+
+DELTA_OVERLAP = 2        # seconds re-exported before the last sync (second-resolution timestamps)
+
+def _delta_path():
+    return CACHE_DIR / (_cache_path().stem.replace("export-", "delta-", 1) + ".json")
+
+def fetch_tasks_delta(fields=None, timeout=30):
+    """Pending tasks (as fetch_tasks(None)) via a `modified.after:<last sync>` export merged into the snapshot."""
+    import time
+    path, fields = _delta_path(), list(fields or [])
+    obj, now = _read_snapshot(path, fields), time.time()
+    synced = int(now)
+    if obj is None or now - obj.get("built", 0) > HOOK_MAX_AGE:
+        entries = {}
+        _merge_records(entries, _stream_task_export(_export_cmd(_OPEN_FILTER), timeout), fields)
+        built, how = synced, "full export"
+    else:
+        entries, built = obj["entries"], obj["built"]
+        since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(obj["synced"] - DELTA_OVERLAP))
+        n = _merge_records(entries, _stream_task_export(_export_cmd(f"modified.after:{since}"), timeout), fields)
+        how = f"{n} changed since {since}"
+        digest = _store_digest()
+        if digest is not None and digest != _snapshot_digest(entries):
+            eprint(f"[TaskCanvas] delta snapshot drifted from the store ({_snapshot_digest(entries)} vs {digest}); re-exporting")
+            entries = {}
+            _merge_records(entries, _stream_task_export(_export_cmd(_OPEN_FILTER), timeout), fields)
+            built, how = synced, "full export"
+    _save_snapshot(path, entries, fields, built, synced=synced)
+    tasks = _snapshot_tasks(entries, now)
+    eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (delta: {how})")
     return tasks
 
 
-def build_payload(tasks):
-    short_by_uuid={t["uuid"]:t["short"] for t in tasks}
-    edges=[]; parent_current_deps={}; children_map={}
+# ======================= Scoped export (--scope) =====================
+# Only the chosen projects are exported, then the dependencies they point at,
+# level by level in batched uuid queries until the closure is complete; tasks
+# outside the projects are marked as ghosts. Tasks outside the scope that
+# depend *on* scoped tasks are not looked up.
+
+SCOPE_BATCH = 100
+
+def _project_term(p):
+    return "project:" if p == "(no project)" else "project:" + shlex.quote(p)
+
+def fetch_tasks_scoped(projects, timeout=30, fields=None):
+    """
+    Pending tasks of `projects` (subprojects included, as Taskwarrior's project:
+    filter does) plus the transitive closure of their pending dependencies,
+    those marked {"ghost": True}. Same records as fetch_tasks otherwise.
+    """
+    terms = " or ".join(_project_term(p) for p in projects)
+    tasks = _normalize_records(_stream_task_export(_export_cmd(f"status:pending ( {terms} )"), timeout), fields)
+    have = {t["uuid"] for t in tasks}
+    asked = set(have)
+    want = sorted({d for t in tasks for d in t["depends"]} - asked)
+    rounds = ghosts = 0
+    while want:
+        rounds += 1
+        asked.update(want)
+        found = []
+        for i in range(0, len(want), SCOPE_BATCH):
+            ids = " or ".join("uuid:" + u for u in want[i:i + SCOPE_BATCH])
+            found += _normalize_records(_stream_task_export(_export_cmd(f"status:pending ( {ids} )"), timeout), fields)
+        nxt = set()
+        for t in found:
+            if t["uuid"] in have:
+                continue
+            t["ghost"] = True
+            have.add(t["uuid"]); tasks.append(t); ghosts += 1
+            nxt.update(t["depends"])
+        want = sorted(nxt - asked)
+    tasks.sort(key=lambda t: (t["project"], t["desc"]))
+    eprint(f"[TaskCanvas] Loaded tasks: {len(tasks)} (scope: {len(tasks) - ghosts} in {len(projects)} project(s), "
+           f"{ghosts} dependency ghost(s) over {rounds} round(s))")
+    return tasks
+
+
+# ======================= Local filter evaluator =====================
+# Evaluates the common Taskwarrior filter grammar over already-loaded records so
+# `--filter` doesn't need a second export. Anything outside the supported subset
+# makes compile_filter() return None and the caller falls back to `task <filter> export`.
+
+class _FilterUnsupported(Exception):
+    pass
+
+_TW_ATTRS = ("depends", "description", "due", "end", "entry", "id", "imask", "mask",
+             "modified", "parent", "priority", "project", "recur", "scheduled", "start",
+             "status", "tags", "until", "urgency", "uuid", "wait")
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+def _resolve_attr(name):
+    """Full attribute name for `name` (exact or unambiguous abbreviation ≥3 chars)."""
+    if name in _TW_ATTRS:
+        return name
+    hits = [a for a in _TW_ATTRS if a.startswith(name)] if len(name) >= 3 else []
+    if len(hits) == 1:
+        return hits[0]
+    raise _FilterUnsupported(name)
+
+def _tw_date(s):
+    """Parse an export timestamp (20251001T120000Z) into an aware datetime, or None."""
+    from datetime import datetime, timezone
+    if not s:
+        return None
+    try:
+        return datetime.strptime(s, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+def _named_date(word, now=None):
+    """Resolve a Taskwarrior named date or ISO date to an aware local datetime."""
+    from datetime import datetime, timedelta
+    now = now or datetime.now().astimezone()
+    sod = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    w = word.lower()
+    if w == "now": return now
+    if w in ("today", "sod"): return sod
+    if w == "eod": return sod + timedelta(days=1) - timedelta(seconds=1)
+    if w == "yesterday": return sod - timedelta(days=1)
+    if w == "tomorrow": return sod + timedelta(days=1)
+    if w in ("sow", "eow"):
+        first = 6 if (_taskrc_get(_tw_rc_path(), "weekstart") or "sunday").lower() == "sunday" else 0
+        start = sod - timedelta(days=(sod.weekday() - first) % 7)
+        return start if w == "sow" else start + timedelta(days=7) - timedelta(seconds=1)
+    if w in ("som", "eom"):
+        start = sod.replace(day=1)
+        if w == "som": return start
+        nxt = (start + timedelta(days=32)).replace(day=1)
+        return nxt - timedelta(seconds=1)
+    if w in ("soy", "eoy"):
+        start = sod.replace(month=1, day=1)
+        return start if w == "soy" else start.replace(year=start.year + 1) - timedelta(seconds=1)
+    if w in _WEEKDAYS:
+        ahead = (_WEEKDAYS.index(w) - sod.weekday()) % 7 or 7
+        return sod + timedelta(days=ahead)
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y%m%dT%H%M%SZ"):
+        try:
+            d = datetime.strptime(word, fmt)
+        except ValueError:
+            continue
+        if fmt.endswith("Z"):
+            from datetime import timezone
+            return d.replace(tzinfo=timezone.utc)
+        return d.astimezone()
+    raise _FilterUnsupported(word)
+
+def _filter_tokens(filter_str):
+    """shlex-split a filter and peel parentheses off into their own tokens."""
+    toks = []
+    for raw in shlex.split(filter_str):
+        lead = []
+        while raw.startswith("("):
+            lead.append("("); raw = raw[1:]
+        trail = []
+        while raw.endswith(")") and raw.count("(") < raw.count(")"):
+            trail.append(")"); raw = raw[:-1]
+        toks += lead + ([raw] if raw else []) + trail
+    return toks
+
+def _compile_term(tok, fold):
+    """Predicate for a single filter term."""
+    if tok[:1] in "+-" and len(tok) > 1 and ":" not in tok:
+        tag, want = tok[1:], tok[0] == "+"
+        if tag.isupper():
+            raise _FilterUnsupported(tok)  # virtual tags need data we don't carry
+        return lambda t: (tag in (t.get("tags") or [])) == want
+
+    if ":" not in tok:
+        if re.fullmatch(r"[0-9a-fA-F]{8}(-[0-9a-fA-F-]{1,28})?", tok):
+            pre = tok.lower()
+            return lambda t: t["uuid"].lower().startswith(pre)
+        raise _FilterUnsupported(tok)  # bare words/ids: description+annotation search, ids
+
+    name, value = tok.split(":", 1)
+    attr, _, mod = name.partition(".")
+    attr = _resolve_attr(attr)
+
+    if attr == "project":
+        norm = fold(value)
+        get = lambda t: "" if t.get("project") in (None, "(no project)") else fold(t["project"])
+        if mod in ("none",) or (mod in ("", "is") and not value):
+            return lambda t: get(t) == ""
+        if mod == "any":
+            return lambda t: get(t) != ""
+        if mod == "":
+            return lambda t: get(t).startswith(norm)
+        if mod == "not":
+            return lambda t: not get(t).startswith(norm)
+        if mod in ("is", "equals"):
+            return lambda t: get(t) == norm
+        if mod in ("isnt",):
+            return lambda t: get(t) != norm
+        if mod in ("has", "contains"):
+            return lambda t: norm in get(t)
+        if mod == "hasnt":
+            return lambda t: norm not in get(t)
+        if mod in ("startswith", "left"):
+            return lambda t: get(t).startswith(norm)
+        if mod in ("endswith", "right"):
+            return lambda t: get(t).endswith(norm)
+
+    elif attr == "status" and mod in ("", "is"):
+        want = value.lower()
+        return lambda t: (t.get("status") or "pending") == want
+
+    elif attr == "description" and mod in ("has", "contains", "hasnt"):
+        norm = fold(value)
+        if mod == "hasnt":
+            return lambda t: norm not in fold(t.get("desc") or "")
+        return lambda t: norm in fold(t.get("desc") or "")
+
+    elif attr == "due":
+        if mod == "none" or (mod == "" and not value):
+            return lambda t: not t.get("due")
+        if mod == "any":
+            return lambda t: bool(t.get("due"))
+        ops = {"before": "lt", "under": "lt", "below": "lt", "by": "le",
+               "after": "gt", "over": "gt", "above": "gt"}
+        if mod in ops and value:
+            ref, op = _named_date(value), ops[mod]
+            def pred(t):
+                d = _tw_date(t.get("due"))
+                if d is None: return False
+                return d < ref if op == "lt" else d <= ref if op == "le" else d > ref
+            return pred
+
+    raise _FilterUnsupported(tok)
+
+def compile_filter(filter_str):
+    """
+    Compile a Taskwarrior filter into a predicate over normalized task records.
+    Supports project[.mod]:, +tag/-tag, status:, due.before/after/by (named dates),
+    description.has:, uuid prefixes, and/or/parentheses (and binds tighter than or).
+    Returns None if any term is outside that subset.
+    """
+    ci = (_taskrc_get(_tw_rc_path(), "search.case.sensitive") or "yes").lower() in ("no", "off", "0", "false")
+    fold = (lambda s: s.lower()) if ci else (lambda s: s)
+    try:
+        toks = _filter_tokens(filter_str or "")
+    except ValueError:
+        return None
+    pos = 0
+
+    def peek():
+        return toks[pos] if pos < len(toks) else None
+
+    def parse_or():
+        nonlocal pos
+        left = parse_and()
+        while peek() == "or":
+            pos += 1
+            a, b = left, parse_and()
+            left = lambda t, a=a, b=b: a(t) or b(t)
+        return left
+
+    def parse_and():
+        nonlocal pos
+        left = parse_unary()
+        while peek() not in (None, "or", ")"):
+            if peek() == "and":
+                pos += 1
+            a, b = left, parse_unary()
+            left = lambda t, a=a, b=b: a(t) and b(t)
+        return left
+
+    def parse_unary():
+        nonlocal pos
+        tok = peek()
+        if tok is None or tok in ("and", "or", ")"):
+            raise _FilterUnsupported(tok)
+        pos += 1
+        if tok == "(":
+            inner = parse_or()
+            if peek() != ")":
+                raise _FilterUnsupported("(")
+            pos += 1
+            return inner
+        if tok in ("xor", "!") or tok.startswith("!"):
+            raise _FilterUnsupported(tok)
+        return _compile_term(tok, fold)
+
+    try:
+        if not toks:
+            return lambda t: True
+        pred = parse_or()
+        if pos != len(toks):
+            return None
+        return pred
+    except _FilterUnsupported:
+        return None
+
+
+def _unique_shorts(tasks):
+    """
+    Short ids per task: the first 8 hex digits of the uuid, extended just far
+    enough to stay unique where those collide (relevant at ~100k tasks).
+    """
+    hexes = [t["uuid"].replace("-", "") for t in tasks]
+    groups = {}
+    for i, h in enumerate(hexes):
+        groups.setdefault(h[:8], []).append(i)
+    shorts = [h[:8] for h in hexes]
+    for ids in groups.values():
+        if len(ids) < 2:
+            continue
+        n = 9
+        while n < 32 and len({hexes[i][:n] for i in ids}) < len(ids):
+            n += 1
+        for i in ids:
+            shorts[i] = hexes[i][:n]
+    return shorts
+
+def _graph_csr(tasks):
+    """
+    Dependency graph as compressed-sparse-row arrays keyed by task index:
+    deps of i are out_idx[out_off[i]:out_off[i+1]], dependents of i are
+    in_idx[in_off[i]:in_off[i+1]]. Edges to tasks outside `tasks` are dropped.
+    """
+    index_by_uuid = {t["uuid"]: i for i, t in enumerate(tasks)}
+    n = len(tasks)
+    out_off, out_idx, in_deg = [0], [], [0] * n
     for t in tasks:
-        p=short_by_uuid[t["uuid"]]
-        for d in (t.get("depends") or []):
-            if d in short_by_uuid:
-                c=short_by_uuid[d]; edges.append({"from":p,"to":c})
-                parent_current_deps.setdefault(p,set()).add(c)
-                children_map.setdefault(c,set()).add(p)
+        row = sorted({index_by_uuid[d] for d in (t.get("depends") or []) if d in index_by_uuid})
+        out_idx += row
+        out_off.append(len(out_idx))
+        for j in row:
+            in_deg[j] += 1
+    in_off = [0]
+    for d in in_deg:
+        in_off.append(in_off[-1] + d)
+    fill, in_idx = in_off[:-1], [0] * len(out_idx)
+    for i in range(n):                       # sources visited in order → each in-row is sorted
+        for j in out_idx[out_off[i]:out_off[i + 1]]:
+            in_idx[fill[j]] = i; fill[j] += 1
+    return {"out_off": out_off, "out_idx": out_idx, "in_off": in_off, "in_idx": in_idx}
+
+def _payload_task(t, short):
+    d = {"uuid":t["uuid"],"short":short,"desc":t["desc"],"project":t["project"],"tags":t["tags"],"has_depends":bool(t["depends"]),"due":t.get("due")}
+    if t.get("ghost"):
+        d["ghost"] = 1
+    return d
+
+def build_payload(tasks, shorts=None):
+    """Payload for the page; `shorts` (one per task) defaults to _unique_shorts(tasks)."""
+    shorts = shorts or _unique_shorts(tasks)
     return {
-        "tasks":[{"uuid":t["uuid"],"short":t["short"],"desc":t["desc"],"project":t["project"],"tags":t["tags"],"has_depends":bool(t["depends"]),"due":t.get("due")} for t in tasks],
-        "graph":{
-            "edges":edges,
-            "parent_current_deps":{k:sorted(v) for k,v in parent_current_deps.items()},
-            "child_to_parents":{k:sorted(v) for k,v in children_map.items()},
-        }
+        "tasks":[_payload_task(t, shorts[i]) for i, t in enumerate(tasks)],
+        "graph":{"csr": _graph_csr(tasks)},
+    }
+
+def task_snapshot(tasks, prev=None):
+    """
+    {uuid: (payload task, dep uuids)} for the --serve delta stream. Tasks already
+    in `prev` keep their short so ids in the open page stay valid; new ones get
+    the shortest unused uuid prefix (8+ hex digits).
+    """
+    if prev is None:
+        shorts = _unique_shorts(tasks)
+    else:
+        used = {prev[t["uuid"]][0]["short"] for t in tasks if t["uuid"] in prev}
+        shorts = []
+        for t in tasks:
+            if t["uuid"] in prev:
+                shorts.append(prev[t["uuid"]][0]["short"]); continue
+            h, n = t["uuid"].replace("-", ""), 8
+            while h[:n] in used and n < len(h):
+                n += 1
+            used.add(h[:n]); shorts.append(h[:n])
+    return {t["uuid"]: (_payload_task(t, shorts[i]), tuple(t["depends"] or ())) for i, t in enumerate(tasks)}
+
+def snapshot_shorts(snap, tasks):
+    """The shorts task_snapshot() assigned, in `tasks` order (for build_payload*)."""
+    return [snap[t["uuid"]][0]["short"] for t in tasks]
+
+def _snapshot_edges(snap):
+    short = {u: rec[0]["short"] for u, rec in snap.items()}
+    return {(short[u], short[d]) for u, rec in snap.items() for d in rec[1] if d in short}
+
+def diff_snapshots(old, new):
+    """
+    Delta between two task_snapshot()s, or None when nothing changed:
+    {"add": [task], "modify": [task], "delete": [short], "edges_add"/"edges_del": [[from, to]]}
+    (edges as in graph.edges: from = dependent task, to = its dependency).
+    """
+    add = [rec[0] for u, rec in new.items() if u not in old]
+    modify = [rec[0] for u, rec in new.items() if u in old and old[u][0] != rec[0]]
+    delete = [rec[0]["short"] for u, rec in old.items() if u not in new]
+    e_old, e_new = _snapshot_edges(old), _snapshot_edges(new)
+    if not (add or modify or delete or e_old != e_new):
+        return None
+    return {"add": add, "modify": modify, "delete": delete,
+            "edges_add": sorted(e_new - e_old), "edges_del": sorted(e_old - e_new)}
+
+def build_payload_columnar(tasks, shorts=None):
+    """
+    Columnar variant of build_payload for large task sets: one array per field,
+    projects/tags interned into dictionary tables referenced by integer, and the
+    same CSR graph. Shorts are derived from the uuid in the page; only the ones
+    lengthened to avoid a collision are shipped (index → short).
+    Decoded back into the build_payload shape by decodePayload() in the page.
+    """
+    proj_ix, tag_ix = {}, {}
+    uuid, desc, project, tags, has_depends, due = [], [], [], [], [], []
+    for t in tasks:
+        uuid.append(t["uuid"])
+        desc.append(t["desc"])
+        project.append(proj_ix.setdefault(t["project"], len(proj_ix)))
+        tags.append([tag_ix.setdefault(g, len(tag_ix)) for g in t["tags"]])
+        has_depends.append(1 if t["depends"] else 0)
+        due.append(t.get("due"))
+    long_shorts = {str(i): s for i, s in enumerate(shorts or _unique_shorts(tasks)) if len(s) > 8}
+    cols = {"uuid": uuid, "desc": desc, "project": project, "tags": tags,
+            "has_depends": has_depends, "due": due}
+    if any(t.get("ghost") for t in tasks):
+        cols["ghost"] = [1 if t.get("ghost") else 0 for t in tasks]
+    return {
+        "format": "columnar-1",
+        "n": len(tasks),
+        "cols": cols,
+        "dict": {"project": list(proj_ix), "tag": list(tag_ix)},
+        "shorts": long_shorts,
+        "graph": {"csr": _graph_csr(tasks)},
     }
 
 
+FIELD_CHUNK = 500
+
+def build_field_chunks(tasks):
+    """
+    Heavy per-task fields split into chunks aligned with the payload task order
+    (chunk k covers tasks k*FIELD_CHUNK …). Each chunk is a list of field dicts
+    (0 for tasks without any), embedded as its own JSON block and parsed on demand.
+    """
+    rows = [t.get("fields") or 0 for t in tasks]
+    return [rows[i:i + FIELD_CHUNK] for i in range(0, len(rows), FIELD_CHUNK)]
+
+def _field_chunk_tags(chunks):
+    return "".join(
+        f"<script id='tc_fields_{k}' type='application/json'>"
+        + json.dumps(c, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+        + "</script>\n"
+        for k, c in enumerate(chunks))
+
+
 # ======================= Better project selector (curses) =====================
 
 def _unique_projects(tasks):
@@ -1816,25 +3126,121 @@ def _unique_projects(tasks):
     return names, counts
 
 
+def _project_tree(projects, counts):
+    """
+    Dotted project names as a tree. Returns (nodes, roots, leaf): nodes are
+    {name, label, depth, parent, kids, projects, total} with `projects` the
+    indices (into `projects`) in the subtree and `total` their summed counts;
+    leaf[i] is the node id of projects[i].
+    """
+    nodes, roots, by_name, leaf = [], [], {}, []
+    for i, p in enumerate(projects):
+        parts = [p] if p == "(no project)" else p.split(".")
+        parent = None
+        for d in range(len(parts)):
+            name = ".".join(parts[:d + 1])
+            n = by_name.get(name)
+            if n is None:
+                n = by_name[name] = len(nodes)
+                nodes.append({"name": name, "label": parts[d], "depth": d, "parent": parent,
+                              "kids": [], "projects": [], "total": 0})
+                (nodes[parent]["kids"] if parent is not None else roots).append(n)
+            nodes[n]["projects"].append(i)
+            nodes[n]["total"] += counts.get(p, 0)
+            parent = n
+        leaf.append(parent)
+    return nodes, roots, leaf
+
+
 def _run_selector_curses(projects, counts):
     """
-    Curses TUI multi-select:
+    Curses TUI multi-select over the project tree (Work.Client.X nests under Work):
       ↑/↓ : move      PgUp/PgDn : page       Home/End : jump
-      Space: toggle   a : select all (visible)    n : none (visible)
+      →/← : expand / collapse (← on a child jumps to its parent)
+      Space: toggle (a parent toggles its subtree)
+      a : select all (visible)    n : none (visible)
       / : filter      Esc : clear filter          q : cancel (return [])
       Enter: confirm
+    Matches are cached per query and a longer query narrows its prefix's
+    matches; the row list is rebuilt only when the query or expansion changes,
+    and drawing touches only the rows on screen.
     """
     import curses
-    sel = set()            # selected project names
-    cursor = 0             # index in filtered list
+    nodes, roots, leaf = _project_tree(projects, counts)
+    lowered = [p.lower() for p in projects]
+    sel = set()            # selected project indices
+    nsel = [0] * len(nodes)  # selected projects per subtree
+    collapsed = set()      # node ids
+    cursor = 0             # index in visible rows
     query = ""             # filter string (case-insensitive)
     show_counts = True
-
-    def filtered():
-        if not query:
-            return projects
+    matches = {"": range(len(projects))}   # lowered query -> matching project indices
+    filtered_rows = {}     # lowered query -> node ids (expanded, matches and their parents)
+    vis = None             # visible node ids; None = rebuild
+
+    def match(q):
+        if q not in matches:
+            k = len(q) - 1
+            while q[:k] not in matches:
+                k -= 1
+            matches[q] = [i for i in matches[q[:k]] if q in lowered[i]]
+        return matches[q]
+
+    def flatten():
         q = query.lower()
-        return [p for p in projects if q in p.lower()]
+        if not q:
+            out, stack = [], roots[::-1]
+            while stack:
+                n = stack.pop()
+                out.append(n)
+                if n not in collapsed:
+                    stack.extend(reversed(nodes[n]["kids"]))
+            return out
+        if q not in filtered_rows:
+            shown = set()
+            for i in match(q):
+                n = leaf[i]
+                while n is not None and n not in shown:
+                    shown.add(n)
+                    n = nodes[n]["parent"]
+            out, stack = [], [n for n in reversed(roots) if n in shown]
+            while stack:
+                n = stack.pop()
+                out.append(n)
+                stack.extend(k for k in reversed(nodes[n]["kids"]) if k in shown)
+            filtered_rows[q] = out
+        return filtered_rows[q]
+
+    def visible():
+        nonlocal vis
+        if vis is None:
+            vis = flatten()
+        return vis
+
+    def set_query(q):
+        nonlocal query, vis
+        if q != query:
+            query, vis = q, None
+
+    def set_sel(i, on):
+        if (i in sel) == on:
+            return
+        if on:
+            sel.add(i)
+        else:
+            sel.discard(i)
+        n, d = leaf[i], (1 if on else -1)
+        while n is not None:
+            nsel[n] += d
+            n = nodes[n]["parent"]
+
+    def targets(n):
+        """Projects a toggle on node n affects: its subtree, narrowed to the filter."""
+        ps = nodes[n]["projects"]
+        if not query:
+            return ps
+        hit = set(match(query.lower()))
+        return [i for i in ps if i in hit]
 
     def clamp(i, L):
         return max(0, min(i, max(0, L - 1)))
@@ -1843,7 +3249,7 @@ def _run_selector_curses(projects, counts):
         stdscr.erase()
         H, W = stdscr.getmaxyx()
 
-        header = " Select projects (Enter=confirm, space=toggle, /=filter, a=all, n=none, q=cancel) "
+        header = " Select projects (Enter=confirm, space=toggle, ←/→=fold, /=filter, a=all, n=none, q=cancel) "
         _safe_addnstr(stdscr, 0, 0, header.ljust(W), W, curses.A_REVERSE)
 
         # If we have at least 2 rows, show filter line
@@ -1857,32 +3263,34 @@ def _run_selector_curses(projects, counts):
         footer_reserved = 1 if H >= 3 else 0
         rows = max(0, H - top - footer_reserved)
 
-        vis = filtered()
+        vis = visible()
 
         # paginate: center cursor when possible; always keep visible
         start = 0
         if rows > 0 and len(vis) > rows:
             start = min(max(cursor - rows // 2, 0), len(vis) - rows)
 
-        # Paint list
+        # Paint only the rows on screen
         for i in range(start, min(len(vis), start + rows)):
-            p = vis[i]
-            mark = "[x]" if p in sel else "[ ]"
-            cnt = f"  ({counts.get(p, 0)})" if show_counts else ""
-            line = f"{mark} {p}{cnt}"
+            node = nodes[vis[i]]
+            k, tot = nsel[vis[i]], len(node["projects"])
+            mark = "[x]" if k == tot else ("[ ]" if not k else "[-]")
+            fold = ("+ " if vis[i] in collapsed and not query else "- ") if node["kids"] else "  "
+            cnt = f"  ({node['total']})" if show_counts else ""
+            line = f"{mark} {'  ' * node['depth']}{fold}{node['label']}{cnt}"
             attr = curses.A_REVERSE if i == cursor else curses.A_NORMAL
             _safe_addnstr(stdscr, top + (i - start), 0, line.ljust(W), W, attr)
 
         # Footer (only if we have room)
         if H >= 3:
-            foot = f"{len(sel)} selected · {len(vis)} shown / {len(projects)} total"
+            foot = f"{len(sel)} selected · {len(match(query.lower()))} shown / {len(projects)} total"
             _safe_addnstr(stdscr, H - 1, 0, foot.ljust(W), W, curses.A_DIM)
 
         stdscr.refresh()
 
 
     def loop(stdscr):
-        nonlocal cursor, query, show_counts, sel
+        nonlocal cursor, show_counts, vis
         curses.curs_set(0)
         stdscr.keypad(True)
         try:
@@ -1890,81 +3298,87 @@ def _run_selector_curses(projects, counts):
         except curses.error:
             pass
 
+        # Start folded to the top level when the whole tree won't fit on screen
+        if len(nodes) > stdscr.getmaxyx()[0] - 3:
+            collapsed.update(n for n, node in enumerate(nodes) if node["kids"])
+
         while True:
-            vis = filtered()
-            cursor = clamp(cursor, len(vis))
+            cursor = clamp(cursor, len(visible()))
             draw(stdscr)
             ch = stdscr.getch()
 
             if ch in (ord('q'), 27) and not query:       # q or Esc (when not editing filter)
-                if ch == 27 and query:  # handled below if we ever allow inline edit w/ Esc
-                    pass
                 return []               # cancel = start empty
 
             if ch in (10, 13, curses.KEY_ENTER):         # Enter
-                return [p for p in projects if p in sel] # preserve original order
+                return [projects[i] for i in sorted(sel)]  # preserve original order
 
             if ch == ord('/'):                           # start/continue filter
                 # simple in-line editing: typing appends; Backspace removes; Enter commits
                 while True:
+                    cursor = clamp(cursor, len(visible()))
                     draw(stdscr)
                     c = stdscr.getch()
                     if c in (10, 13, curses.KEY_ENTER):  # finish filter
                         break
                     if c in (27,):                       # Esc clears filter
-                        query = ""
+                        set_query("")
                         break
                     if c in (curses.KEY_BACKSPACE, 127, 8):
-                        query = query[:-1]
+                        set_query(query[:-1])
                     elif c == curses.KEY_RESIZE:
                         pass
                     elif 32 <= c <= 126:  # printable ASCII
-                        query += chr(c)
-
-                # clamp cursor after filter change
-                cursor = clamp(cursor, len(filtered()))
-                continue
-
-            if ch == ord('a'):                           # select all (visible)
-                for p in filtered():
-                    sel.add(p)
+                        set_query(query + chr(c))
                 continue
 
-            if ch == ord('n'):                           # clear all (visible)
-                for p in filtered():
-                    if p in sel:
-                        sel.remove(p)
+            if ch in (ord('a'), ord('n')):               # select / clear all (visible)
+                for i in match(query.lower()):
+                    set_sel(i, ch == ord('a'))
                 continue
 
-
             if ch == ord('c'):                           # toggle counts display (optional)
                 show_counts = not show_counts
                 continue
 
+            rows = visible()
             if ch in (curses.KEY_UP, ord('k')):
-                cursor = clamp(cursor - 1, len(filtered()))
+                cursor = clamp(cursor - 1, len(rows))
             elif ch in (curses.KEY_DOWN, ord('j')):
-                cursor = clamp(cursor + 1, len(filtered()))
+                cursor = clamp(cursor + 1, len(rows))
             elif ch == curses.KEY_PPAGE:  # PageUp
-                cursor = clamp(cursor - max(5, curses.LINES - 4), len(filtered()))
+                cursor = clamp(cursor - max(5, curses.LINES - 4), len(rows))
             elif ch == curses.KEY_NPAGE:  # PageDown
-                cursor = clamp(cursor + max(5, curses.LINES - 4), len(filtered()))
+                cursor = clamp(cursor + max(5, curses.LINES - 4), len(rows))
             elif ch == curses.KEY_HOME:
                 cursor = 0
             elif ch == curses.KEY_RESIZE:
               # Let draw() re-read H,W and recalc layout on next iteration
               continue
             elif ch == curses.KEY_END:
-                cursor = max(0, len(filtered()) - 1)
+                cursor = max(0, len(rows) - 1)
+            elif not rows:
+                continue
+            elif ch in (curses.KEY_RIGHT, ord('l')):     # expand, or step into it
+                n = rows[cursor]
+                if n in collapsed and not query:
+                    collapsed.discard(n); vis = None
+                elif nodes[n]["kids"]:
+                    cursor += 1
+            elif ch in (curses.KEY_LEFT, ord('h')):      # collapse, or jump to parent
+                n = rows[cursor]
+                if nodes[n]["kids"] and n not in collapsed and not query:
+                    collapsed.add(n); vis = None
+                else:
+                    depth = nodes[n]["depth"]
+                    while depth and cursor > 0 and nodes[rows[cursor]]["depth"] >= depth:
+                        cursor -= 1
             elif ch in (ord(' '),):  # toggle selection
-                if filtered():
-                    p = filtered()[cursor]
-                    if p in sel:
-                        sel.remove(p)
-                    else:
-                        sel.add(p)
+                ps = targets(rows[cursor])
+                on = any(i not in sel for i in ps)
+                for i in ps:
+                    set_sel(i, on)
 
-    import curses
     return curses.wrapper(loop)
 
 def _safe_addnstr(scr, y, x, s, max_cols, attr=0):
@@ -2050,6 +3464,232 @@ def _append_remove_mode(html):
 
 def _json_text(d:dict)->str: return json.dumps(d, ensure_ascii=False)
 
+def _gzip_b64(text: str) -> str:
+    """gzip (mtime=0, so output is reproducible) + base64 for embedding in the page."""
+    import base64, gzip
+    return base64.b64encode(gzip.compress(text.encode("utf-8"), 6, mtime=0)).decode("ascii")
+
+# Turns the wire payload (plain or columnar, CSR graph) into the shape the page
+# uses: DATA.tasks plus DATA.graph.{csr, edges, parent_current_deps, child_to_parents}.
+# Tasks and the object-shaped graph views are materialized lazily on first access;
+# csrDeps()/csrParents() answer neighbor queries straight from the typed arrays.
+# window.EXIST_EDGES is copied from graph.edges only when read; the canvas's own
+# edge passes use placedExistEdges(), which reads the CSR rows of placed nodes.
+PAYLOAD_DECODER_JS = r"""<script id="PAYLOAD_DECODER_V2">
+window.GRAPH_CSR = null;
+(function(){
+  var edges = [], src = null, set = false;
+  Object.defineProperty(window, 'EXIST_EDGES', { enumerable:true, configurable:true,
+    get:function(){
+      if (edges === null) edges = (src && Array.isArray(src.edges)) ? src.edges.slice() : [];
+      return edges;
+    }, set:function(v){ edges = v; set = true; } });
+  window.setExistEdgesLazy = function(G, ifUnset){
+    if (ifUnset && set) return;
+    src = G || null; edges = null; set = true;
+  };
+  // true while EXIST_EDGES is still the untouched graph (CSR rows are authoritative)
+  window.existEdgesPending = function(){ return edges === null && !!window.GRAPH_CSR; };
+})();
+// Existing edges between tasks placed on the canvas, as {from, to} shorts
+window.placedExistEdges = function(){
+  if (!existEdgesPending()) return window.EXIST_EDGES || [];
+  var at = {}, rows = [], out = [];
+  document.querySelectorAll('#builderStage .node[data-short]').forEach(function(n){
+    var s = n.getAttribute('data-short'), i = window.SHORT_INDEX && window.SHORT_INDEX[s];
+    if (i != null && !(i in at)){ at[i] = s; rows.push(i); }
+  });
+  rows.forEach(function(i){
+    var deps = csrDeps(i);
+    for (var k=0;k<deps.length;k++) if (deps[k] in at) out.push({from:at[i], to:at[deps[k]]});
+  });
+  return out;
+};
+window.csrDeps = function(i){
+  var G = window.GRAPH_CSR; if (!G || !(i >= 0 && i < G.n)) return new Int32Array(0);
+  return G.outIdx.subarray(G.outOff[i], G.outOff[i+1]);
+};
+window.csrParents = function(i){
+  var G = window.GRAPH_CSR; if (!G || !(i >= 0 && i < G.n)) return new Int32Array(0);
+  return G.inIdx.subarray(G.inOff[i], G.inOff[i+1]);
+};
+window.decodePayload = function(C){
+  if (!C || typeof C !== 'object') return C;
+  var out = C, tasks = null;
+  if (C.format === 'columnar-1'){
+    var cols = C.cols || {}, n = C.n|0, PJ = (C.dict && C.dict.project) || [], TG = (C.dict && C.dict.tag) || [];
+    var LONG = C.shorts || {};
+    out = {};
+    Object.keys(C).forEach(function(k){
+      if (k!=='format' && k!=='n' && k!=='cols' && k!=='dict' && k!=='shorts' && k!=='graph') out[k] = C[k];
+    });
+    var buildTasks = function(){
+      var arr = new Array(n);
+      for (var i=0;i<n;i++){
+        var u = cols.uuid[i], tg = cols.tags[i] || [], names = new Array(tg.length);
+        for (var k=0;k<tg.length;k++) names[k] = TG[tg[k]];
+        arr[i] = { uuid:u, short:LONG[i] || String(u).replace(/-/g,'').slice(0,8), desc:cols.desc[i],
+                   project:PJ[cols.project[i]], tags:names, has_depends:!!cols.has_depends[i], due:cols.due[i] };
+        if (cols.ghost && cols.ghost[i]) arr[i].ghost = 1;
+      }
+      return arr;
+    };
+    Object.defineProperty(out, 'tasks', { enumerable:true, configurable:true,
+      get:function(){ return tasks || (tasks = buildTasks()); }, set:function(v){ tasks = v; } });
+  }
+  var raw = (C.graph && C.graph.csr) || null;
+  if (!raw) return out;
+  var csr = {
+    n: raw.out_off.length - 1,
+    outOff: Int32Array.from(raw.out_off), outIdx: Int32Array.from(raw.out_idx),
+    inOff:  Int32Array.from(raw.in_off),  inIdx:  Int32Array.from(raw.in_idx)
+  };
+  var g = { csr: csr }, edges = null, pcd = null, ctp = null;
+  function shortAt(i){ return out.tasks[i].short; }
+  function adjacency(off, idx){
+    var m = {};
+    for (var i=0;i<csr.n;i++){
+      if (off[i] === off[i+1]) continue;
+      var row = [];
+      for (var k=off[i];k<off[i+1];k++) row.push(shortAt(idx[k]));
+      m[shortAt(i)] = row.sort();
+    }
+    return m;
+  }
+  Object.defineProperty(g, 'edges', { enumerable:true, configurable:true,
+    get:function(){
+      if (edges) return edges;
+      edges = [];
+      for (var i=0;i<csr.n;i++)
+        for (var k=csr.outOff[i];k<csr.outOff[i+1];k++) edges.push({from:shortAt(i), to:shortAt(csr.outIdx[k])});
+      return edges;
+    }, set:function(v){ edges = v; } });
+  Object.defineProperty(g, 'parent_current_deps', { enumerable:true, configurable:true,
+    get:function(){ return pcd || (pcd = adjacency(csr.outOff, csr.outIdx)); }, set:function(v){ pcd = v; } });
+  Object.defineProperty(g, 'child_to_parents', { enumerable:true, configurable:true,
+    get:function(){ return ctp || (ctp = adjacency(csr.inOff, csr.inIdx)); }, set:function(v){ ctp = v; } });
+  out.graph = g;
+  return out;
+};
+</script>
+"""
+
+# Reads #payload_data (plain JSON or gzip+base64), decodes it and boots the page.
+PAYLOAD_RUNNER_JS = """<script>(function(){
+      function boot(data){
+        try{
+        window.DATA = (typeof data === 'string') ? JSON.parse(data) : data;
+        if (typeof window.decodePayload === 'function') window.DATA = window.decodePayload(window.DATA);
+        window.DATA_READY = true;
+        var tlen = (window.DATA && Array.isArray(window.DATA.tasks)) ? window.DATA.tasks.length : 0;
+        console.log('[payload] tasks =', tlen);
+        try { document.dispatchEvent(new CustomEvent('twdata')); } catch(_) {}
+    try {
+      if (!window.__INIT_DONE__ && typeof initFromDATA==='function') {
+        window.__INIT_DONE__ = true;
+        console.log('[payload] calling initFromDATA directly');
+        initFromDATA();
+      }
+    } catch(e) { console.log('[payload] initFromDATA error', e); }
+      } catch(e){
+        console.log('[payload] parse error', e);
+        window.DATA = {tasks:[],graph:{}}; window.DATA_READY = false;
+      }
+      }
+      function fail(e){ console.log('[payload] decode error', e); boot({tasks:[],graph:{}}); window.DATA_READY = false; }
+      var el = document.getElementById('payload_data');
+      var raw = el ? el.textContent : '';
+      window.__RAW_LEN__ = raw.length;
+      console.log('[payload] raw length (end) =', window.__RAW_LEN__);
+      // Minimal gzip inflater for browsers without DecompressionStream (RFC 1951/1952)
+      function tcInflate(src){
+        var LB=[3,4,5,6,7,8,9,10,11,13,15,17,19,23,27,31,35,43,51,59,67,83,99,115,131,163,195,227,258],
+            LX=[0,0,0,0,0,0,0,0,1,1,1,1,2,2,2,2,3,3,3,3,4,4,4,4,5,5,5,5,0],
+            DB=[1,2,3,4,5,7,9,13,17,25,33,49,65,97,129,193,257,385,513,769,1025,1537,2049,3073,4097,6145,8193,12289,16385,24577],
+            DX=[0,0,0,0,1,1,2,2,3,3,4,4,5,5,6,6,7,7,8,8,9,9,10,10,11,11,12,12,13,13],
+            CL=[16,17,18,0,8,7,9,6,10,5,11,4,12,3,13,2,14,1,15];
+        var n = src.length, p = 10, flg = src[3], bb = 0, bc = 0, o = 0, i;
+        if (flg & 4) p += 2 + (src[10] | src[11] << 8);
+        if (flg & 8) while (src[p++]);
+        if (flg & 16) while (src[p++]);
+        if (flg & 2) p += 2;
+        var out = new Uint8Array((src[n-4] | src[n-3] << 8 | src[n-2] << 16 | src[n-1] << 24) >>> 0);
+        function bits(k){
+          while (bc < k){ bb |= src[p++] << bc; bc += 8; }
+          var v = bb & ((1 << k) - 1); bb >>>= k; bc -= k; return v;
+        }
+        function table(lens, m){            // canonical Huffman: counts per length + symbols by code
+          var c = new Uint16Array(16), offs = new Uint16Array(16), s = new Uint16Array(m), j;
+          for (j=0;j<m;j++) c[lens[j]]++;
+          c[0] = 0;
+          for (j=1;j<16;j++) offs[j] = offs[j-1] + c[j-1];
+          for (j=0;j<m;j++) if (lens[j]) s[offs[lens[j]]++] = j;
+          return {c:c, s:s};
+        }
+        function sym(h){
+          for (var len=1, code=0, first=0, idx=0; len<16; len++){
+            code |= bits(1);
+            var cnt = h.c[len];
+            if (code - cnt < first) return h.s[idx + code - first];
+            idx += cnt; first = (first + cnt) << 1; code <<= 1;
+          }
+          throw new Error('inflate: bad code');
+        }
+        var last;
+        do {
+          last = bits(1);
+          var type = bits(2), lt, dt;
+          if (type === 0){
+            bb = bc = 0;
+            var slen = src[p] | src[p+1] << 8;
+            p += 4; out.set(src.subarray(p, p + slen), o); o += slen; p += slen;
+            continue;
+          }
+          if (type === 1){
+            var fl = new Uint8Array(288), fd = new Uint8Array(30);
+            for (i=0;i<288;i++) fl[i] = i < 144 ? 8 : i < 256 ? 9 : i < 280 ? 7 : 8;
+            fd.fill(5);
+            lt = table(fl, 288); dt = table(fd, 30);
+          } else if (type === 2){
+            var hl = bits(5) + 257, hd = bits(5) + 1, hc = bits(4) + 4, cl = new Uint8Array(19);
+            for (i=0;i<hc;i++) cl[CL[i]] = bits(3);
+            var ct = table(cl, 19), lens = new Uint8Array(hl + hd);
+            for (i=0;i<hl+hd;){
+              var s = sym(ct);
+              if (s < 16){ lens[i++] = s; continue; }
+              var v = 0, rep;
+              if (s === 16){ v = lens[i-1]; rep = 3 + bits(2); }
+              else rep = s === 17 ? 3 + bits(3) : 11 + bits(7);
+              while (rep--) lens[i++] = v;
+            }
+            lt = table(lens.subarray(0, hl), hl); dt = table(lens.subarray(hl), hd);
+          } else throw new Error('inflate: bad block');
+          for (;;){
+            var c = sym(lt);
+            if (c < 256){ out[o++] = c; continue; }
+            if (c === 256) break;
+            c -= 257;
+            var len = LB[c] + bits(LX[c]), d = sym(dt);
+            d = DB[d] + bits(DX[d]);
+            for (var k=0;k<len;k++,o++) out[o] = out[o - d];
+          }
+        } while (!last);
+        return out;
+      }
+      if (!el || el.type !== 'application/gzip+base64'){ boot(raw); return; }
+      try{
+        var bin = atob(raw.trim()), bytes = new Uint8Array(bin.length);
+        for (var i=0;i<bin.length;i++) bytes[i] = bin.charCodeAt(i);
+        if (typeof DecompressionStream === 'function'){
+          var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+          new Response(stream).text().then(boot, fail);
+        } else {
+          boot(new TextDecoder().decode(tcInflate(bytes)));   // slower, same result
+        }
+      } catch(e){ fail(e); }
+    })();</script>
+"""
+
 HTML = r"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -2081,6 +3721,11 @@ HTML = r"""<!DOCTYPE html>
   #q{flex:1;padding:8px 10px;border-radius:8px;border:1px solid #2a3344;background:#0e1320;color:var(--fg)}
   .section{margin-top:8px;margin-bottom:4px;color:var(--muted);font-weight:800}
   .item{cursor:grab;padding:8px;border:1px solid #2a3344;border-radius:6px;margin-bottom:6px;background:#0f1525}
+  #list{position:relative;flex:none}
+  #list>.vrow{position:absolute;left:0;right:0;margin:0}
+  #list>.section.vrow{padding:8px 0 4px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
+  #list>.item.vrow .desc{display:-webkit-box;-webkit-line-clamp:2;-webkit-box-orient:vertical;overflow:hidden}
+  .node.ghost, #list>.item.ghost{opacity:.6;border-style:dashed}
   .short{font-weight:800;color:var(--accent);display:flex;align-items:center;gap:8px}
   .desc{margin:6px 0}
   .meta{color:var(--muted);font-size:12px}
@@ -2315,13 +3960,11 @@ HTML = r"""<!DOCTYPE html>
 })();</script>
 
 <script>
-/* __EXISTING_SOLID_V3A__ boot EXIST_EDGES from payload graph.edges */
+/* __EXISTING_SOLID_V3A__ boot EXIST_EDGES from payload graph.edges (copied on first read) */
 (function(){
   try{
     var G = (window.DATA && window.DATA.graph) ? window.DATA.graph : (window.GRAPH || {});
-    if (!('EXIST_EDGES' in window)){
-      window.EXIST_EDGES = (G && Array.isArray(G.edges)) ? G.edges.slice() : [];
-    }
+    setExistEdgesLazy(G, true);
   }catch(_){}
   setTimeout(function(){
     try{ if (typeof refreshDepHandleLetters === 'function') refreshDepHandleLetters(); }catch(_){}
@@ -2449,6 +4092,7 @@ var TASKS = [];
 var INIT_MAIN_TAG = {};     // short -> initial main tag
 var INIT_PROJECT = {};      // short -> initial project
 var TASK_BY_SHORT = {};     // short -> task object (live)
+var SHORT_INDEX = {};       // short -> payload task index (GRAPH_CSR row)
 var PARENT_DEPS0 = {};
 var CHILD_TO_PARENTS = {};
 
@@ -2559,55 +4203,367 @@ function matches(t, f){
     if(!t.tags || t.tags.map(function(x){return (x||"").toLowerCase();}).indexOf(f.tags[i])===-1) return false;
   }
   var hay=(t.desc||"").toLowerCase()+" "+(t.project||"").toLowerCase()+" "+(t.tags||[]).join(" ").toLowerCase();
+  if(f.text.length && typeof window.taskFieldsText==='function') hay+=" "+taskFieldsText(t);
   for(var j=0;j<f.text.length;j++){ if(hay.indexOf(f.text[j])===-1) return false; }
   return true;
 }
+/* ===== Search index ===== */
+// Built once per TASKS array: a lowercase haystack per task plus project and tag
+// posting lists of slot numbers (slots follow TASKS order); the trigram posting
+// lists follow at the next idle moment so page load isn't held up. A query narrows
+// to the previous result when it only adds to the previous query, else to the
+// smallest posting list, then verifies against the cached haystacks.
+// searchIndexAdd()/searchIndexRemove() keep it current for tasks created or
+// dropped on the page; in-place edits (drag to another project, tag changes) are
+// caught by a per-query check of each slot's desc/project/tags references.
+var SEARCH = null, SEARCH_NONE = [];
+function buildSearchIndex(){
+  SEARCH = { src:TASKS, task:[], hay:[], proj:[], tags:[], sig:[], sid:new Map(),
+             byProj:new Map(), byTag:new Map(), tri:null, live:0, ver:0, sorted:true, last:null };
+  for (var i=0;i<TASKS.length;i++) searchIndexAdd(TASKS[i]);
+  var S = SEARCH;
+  (window.requestIdleCallback || setTimeout)(function(){ buildTrigrams(S); });
+  return S;
+}
+function buildTrigrams(S){
+  if (S !== SEARCH || S.tri) return;
+  S.tri = new Map();
+  for (var sid=0;sid<S.task.length;sid++) if (S.task[sid]) indexTrigrams(S, S.hay[sid], sid);
+}
+function indexTrigrams(S, hay, sid){
+  for (var j=0;j+3<=hay.length;j++){
+    var g = hay.substr(j, 3);
+    if (g.indexOf(" ") < 0) searchPost(S.tri, g, sid);   // query words never contain spaces
+  }
+}
+function searchPost(map, key, sid){
+  var a = map.get(key);
+  if (!a){ map.set(key, [sid]); return; }
+  var last = a[a.length-1];
+  if (last === sid) return;
+  if (last > sid) SEARCH.sorted = false;     // slot re-indexed after an edit
+  a.push(sid);
+}
+function indexSlot(t, sid){
+  var S = SEARCH, proj = (t.project||"").toLowerCase();
+  var tags = (t.tags||[]).map(function(x){ return (x||"").toLowerCase(); });
+  var hay = (t.desc||"").toLowerCase()+" "+proj+" "+tags.join(" ");
+  S.task[sid]=t; S.hay[sid]=hay; S.proj[sid]=proj; S.tags[sid]=tags;
+  S.sig[sid]=[t.desc, t.project, t.tags, t.tags ? t.tags.length : 0];
+  searchPost(S.byProj, proj, sid);
+  for (var i=0;i<tags.length;i++) searchPost(S.byTag, tags[i], sid);
+  if (S.tri) indexTrigrams(S, hay, sid);
+  if (S.workerGen) searchWorkerSync('put', S, sid);
+  S.ver++;
+}
+function searchIndexAdd(t){
+  var S = SEARCH;
+  if (!S || S.src !== TASKS || S.sid.has(t)) return;
+  var sid = S.task.length;
+  S.sid.set(t, sid); S.live++;
+  indexSlot(t, sid);
+}
+function searchIndexRemove(t){
+  var S = SEARCH, sid = S ? S.sid.get(t) : null;
+  if (sid == null) return;
+  S.sid.delete(t); S.task[sid]=null; S.hay[sid]=null; S.live--; S.ver++;
+  if (S.workerGen) searchWorkerSync('del', S, sid);
+}
+function searchIndexFresh(){
+  if (!SEARCH || SEARCH.src !== TASKS) return buildSearchIndex();
+  var S = SEARCH, i, t, s;
+  for (i=0;i<S.task.length;i++){
+    t = S.task[i]; if (!t) continue;
+    s = S.sig[i];
+    if (t.desc!==s[0] || t.project!==s[1] || t.tags!==s[2] || (t.tags ? t.tags.length : 0)!==s[3]) indexSlot(t, i);
+  }
+  if (S.live !== TASKS.length){
+    for (i=0;i<TASKS.length;i++) searchIndexAdd(TASKS[i]);     // pushed without searchIndexAdd
+    if (S.live !== TASKS.length) return buildSearchIndex();     // spliced out without searchIndexRemove
+  }
+  return S;
+}
+// Every task matching query b also matches query a
+function searchRefines(a, b){
+  if (a.proj && !(b.proj && b.proj.indexOf(a.proj) >= 0)) return false;
+  for (var i=0;i<a.tags.length;i++) if (b.tags.indexOf(a.tags[i]) < 0) return false;
+  for (var j=0;j<a.text.length;j++){
+    var w = a.text[j];
+    if (!b.text.some(function(x){ return x.indexOf(w) >= 0; })) return false;
+  }
+  return true;
+}
+// Tasks matching a parseQuery() result, in TASKS order (same semantics as matches())
+function searchTasks(f){
+  var S = searchIndexFresh(), cand = null, i, j;
+  var withFields = typeof window.taskFieldsText === 'function' && window.DATA && DATA.fields;
+  function pick(a){ if (!cand || a.length < cand.length) cand = a; }
+  if (S.last && S.last.ver === S.ver && searchRefines(S.last.f, f)){
+    cand = S.last.sids;
+  } else {
+    for (i=0;i<f.tags.length;i++) pick(S.byTag.get(f.tags[i]) || SEARCH_NONE);
+    if (f.proj){
+      var u = null, merged = false;
+      S.byProj.forEach(function(a, p){
+        if (p.indexOf(f.proj) < 0) return;
+        if (u){ u = u.concat(a); merged = true; } else u = a;
+      });
+      if (merged) u.sort(function(x, y){ return x - y; });
+      pick(u || SEARCH_NONE);
+    }
+    if (S.tri && !withFields){   // lazily loaded field text isn't in the trigram index
+      for (i=0;i<f.text.length;i++){
+        for (j=0;j+3<=f.text[i].length;j++) pick(S.tri.get(f.text[i].substr(j, 3)) || SEARCH_NONE);
+      }
+    }
+  }
+  var sids = [], n = cand ? cand.length : S.task.length;
+  outer:
+  for (i=0;i<n;i++){
+    var sid = cand ? cand[i] : i, t = S.task[sid];
+    if (!t) continue;
+    if (f.proj && S.proj[sid].indexOf(f.proj) < 0) continue;
+    for (j=0;j<f.tags.length;j++) if (S.tags[sid].indexOf(f.tags[j]) < 0) continue outer;
+    for (j=0;j<f.text.length;j++){
+      if (S.hay[sid].indexOf(f.text[j]) < 0 && !(withFields && taskFieldsText(t).indexOf(f.text[j]) >= 0)) continue outer;
+    }
+    sids.push(sid);
+  }
+  if (!S.sorted && cand){
+    sids.sort(function(x, y){ return x - y; });
+    sids = sids.filter(function(x, k){ return !k || x !== sids[k-1]; });
+  }
+  S.last = { f:f, ver:S.ver, sids:sids };
+  return sids.map(function(sid){ return S.task[sid]; });
+}
+/* ===== Search worker ===== */
+// For large task sets the drawer's matching runs in a Worker (from a Blob URL)
+// holding a copy of the index's text columns; the main thread only keeps the
+// columns in sync (reset on rebuild, put/del per slot). Queries carry a sequence
+// number: the worker runs only the newest pending query and answers with the
+// matching slots as a transferred Int32Array; answers to superseded queries are
+// dropped. Without Worker support (or on a worker error) searchTasks() runs here.
+var SEARCH_WORKER = null, SEARCH_WORKER_MIN = 2000, SEARCH_SEQ = 0, SEARCH_GEN = 0;
+function searchWorkerMain(){
+  var hay = [], proj = [], tags = [], last = null, pending = null;
+  function run(){
+    var m = pending; pending = null;
+    if (!m) return;
+    var f = m.f, cand = (last && searchRefines(last.f, f)) ? last.sids : null, sids = [], i, j;
+    var n = cand ? cand.length : hay.length;
+    outer:
+    for (i=0;i<n;i++){
+      var sid = cand ? cand[i] : i;
+      if (hay[sid] == null) continue;
+      if (f.proj && proj[sid].indexOf(f.proj) < 0) continue;
+      for (j=0;j<f.tags.length;j++) if (tags[sid].indexOf(f.tags[j]) < 0) continue outer;
+      for (j=0;j<f.text.length;j++) if (hay[sid].indexOf(f.text[j]) < 0) continue outer;
+      sids.push(sid);
+    }
+    last = { f:f, sids:sids };
+    var out = Int32Array.from(sids);
+    self.postMessage({ seq:m.seq, gen:m.gen, sids:out }, [out.buffer]);
+  }
+  self.onmessage = function(e){
+    var m = e.data;
+    if (m.type === 'reset'){ hay = m.hay; proj = m.proj; tags = m.tags; last = null; }
+    else if (m.type === 'put'){ hay[m.sid] = m.hay; proj[m.sid] = m.proj; tags[m.sid] = m.tags; last = null; }
+    else if (m.type === 'del'){ hay[m.sid] = null; last = null; }
+    else if (m.type === 'query'){
+      if (!pending) setTimeout(run, 0);     // queries queued behind this one replace it before it runs
+      pending = m;
+    }
+  };
+}
+function searchWorker(){
+  if (SEARCH_WORKER !== null) return SEARCH_WORKER;
+  try {
+    var src = searchRefines.toString() + "\n(" + searchWorkerMain.toString() + ")();";
+    var w = new Worker(URL.createObjectURL(new Blob([src], { type:'text/javascript' })));
+    w.onmessage = onSearchResult;
+    w.onerror = function(){ SEARCH_WORKER = false; SEARCH_GEN++; try{ renderList(); }catch(_){} };
+    SEARCH_WORKER = w;
+  } catch(_){ SEARCH_WORKER = false; }
+  return SEARCH_WORKER;
+}
+function searchWorkerSync(type, S, sid){
+  var w = SEARCH_WORKER;
+  if (!w || S !== SEARCH) return;
+  if (type === 'reset') w.postMessage({ type:'reset', hay:S.hay, proj:S.proj, tags:S.tags });
+  else if (type === 'put') w.postMessage({ type:'put', sid:sid, hay:S.hay[sid], proj:S.proj[sid], tags:S.tags[sid] });
+  else w.postMessage({ type:'del', sid:sid });
+}
+var searchWaiting = null;
+// Run f in the worker and call done(tasks) with the newest answer; false when it can't be used
+function searchInWorker(f, done){
+  if (TASKS.length < SEARCH_WORKER_MIN || (typeof window.taskFieldsText === 'function' && window.DATA && DATA.fields)) return false;
+  var S = searchIndexFresh(), w = SEARCH_WORKER || (SEARCH_WORKER === null && searchWorker());
+  if (!w) return false;
+  if (S.workerGen == null){ S.workerGen = ++SEARCH_GEN; searchWorkerSync('reset', S); }
+  searchWaiting = { seq:++SEARCH_SEQ, gen:S.workerGen, done:done };
+  w.postMessage({ type:'query', seq:searchWaiting.seq, gen:S.workerGen, f:f });
+  return true;
+}
+function onSearchResult(e){
+  var m = e.data, W = searchWaiting, S = SEARCH;
+  if (!W || m.seq !== W.seq || !S || m.gen !== S.workerGen) return;   // superseded keystroke or rebuilt index
+  searchWaiting = null;
+  var out = [];
+  for (var i=0;i<m.sids.length;i++){ var t = S.task[m.sids[i]]; if (t) out.push(t); }
+  W.done(out);
+}
 // helper: collapse full UUIDs to short (8 chars)
+// uuid -> the task's short id (longer than 8 hex digits where prefixes collide),
+// plus the 8-digit prefixes in use; rebuilt when TASKS is replaced or changes length, or on a miss.
+var UUID_SHORT={}, UUID_PREFIX8={}, UUID_SHORT_OF=null, UUID_SHORT_N=-1;
+function uuidShort(u){
+  for (var pass=0; pass<2; pass++){
+    if (UUID_SHORT_OF!==TASKS || UUID_SHORT_N!==TASKS.length){
+      UUID_SHORT={}; UUID_PREFIX8={}; UUID_SHORT_OF=TASKS; UUID_SHORT_N=TASKS.length;
+      for (var i=0;i<TASKS.length;i++){
+        var t=TASKS[i]; if (!t || !t.uuid || !t.short) continue;
+        UUID_SHORT[String(t.uuid).toLowerCase()]=t.short; UUID_PREFIX8[t.short.slice(0, 8)]=1;
+      }
+    }
+    if (UUID_SHORT[u]) return UUID_SHORT[u];
+    UUID_SHORT_OF=null;
+  }
+  return null;
+}
 function shortenUUIDs(s){
   return String(s || '').replace(
     /\b[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}\b/gi,
-    m => m.slice(0, 8)
+    function(m){
+      var sh = uuidShort(m.toLowerCase());
+      if (!sh && UUID_PREFIX8[m.slice(0, 8).toLowerCase()]) return m;   // unknown task sharing a known prefix
+      // as many hex digits as the short id, kept in dashed uuid form (a partial uuid Taskwarrior accepts)
+      for (var k=0, hex=0, n=sh ? sh.length : 8; hex<n; k++) if (m[k] !== '-') hex++;
+      return m.slice(0, k);
+    }
   );
 }
+// Id to put in a command for a task given its uuid or short id (see shortenUUIDs)
+function taskCmdId(x){
+  x = String(x || '');
+  var t = TASK_BY_SHORT[x];
+  if (t && t.uuid && String(t.uuid).indexOf('new-') !== 0) x = String(t.uuid);
+  return shortenUUIDs(x);
+}
 
-/* ===== Drawer list ===== */
+/* ===== Drawer list (virtualized) ===== */
+// renderList() only rebuilds the row model (project sections + tasks); paintList()
+// mounts the rows inside the drawer's visible window (plus overscan) at fixed
+// offsets inside a spacer as tall as the whole list, recycling row elements.
+var LIST_ROWS=[], LIST_TOPS=[0], LIST_MOUNTED=new Map(), LIST_POOL={section:[], item:[], empty:[]};
+var LIST_H=null, LIST_H_GUESS={section:27, item:74, empty:27}, LIST_OVERSCAN=6, listPaintQueued=false;
+function listRowHeights(){
+  if (LIST_H) return LIST_H;
+  var sec=document.createElement('div'); sec.className="section vrow"; sec.textContent="X";
+  var it=document.createElement('div'); it.className="item vrow";
+  it.innerHTML='<div class="short">X</div><div class="desc">X<br>X</div>';
+  list.appendChild(sec); list.appendChild(it);
+  var sh=sec.offsetHeight, ih=it.offsetHeight;
+  sec.remove(); it.remove();
+  if (!ih) return LIST_H_GUESS;        // drawer hidden: measured on a later paint
+  return (LIST_H={ section:sh, item:ih+6, empty:sh });
+}
 function renderList(){
-  list.innerHTML="";
   count.textContent="Loaded: "+TASKS.length;
-  var f=parseQuery(q ? q.value : "");
-  var filtered;
-  if ((q && q.value && q.value.trim()) || (hideHasDeps && hideHasDeps.checked)){
-    filtered=TASKS.filter(function(t){return matches(t,f);});
-    if (hideHasDeps && hideHasDeps.checked){ filtered = filtered.filter(function(t){ return !t.has_depends; }); }
-  } else { filtered=TASKS.slice(); }
+  var f=parseQuery(q ? q.value : ""), hide=hideHasDeps && hideHasDeps.checked;
+  var show=function(filtered){ showList(hide ? filtered.filter(function(t){ return !t.has_depends; }) : filtered); };
+  if (f.proj || f.tags.length || f.text.length){
+    if (!searchInWorker(f, show)) show(searchTasks(f));     // worker answers asynchronously
+  } else {
+    searchWaiting = null;
+    show(TASKS);
+  }
+}
+function showList(filtered){
   var byProj={}, i;
   for(i=0;i<filtered.length;i++){
     var p=filtered[i].project||"(no project)";
     if(!byProj[p]) byProj[p]=[];
     byProj[p].push(filtered[i]);
   }
-  var keys=Object.keys(byProj).sort();
+  var keys=Object.keys(byProj).sort(), rows=[];
   for(i=0;i<keys.length;i++){
-    var proj=keys[i];
-    var sec=document.createElement('div'); sec.className="section"; sec.textContent=proj+" ("+byProj[proj].length+")";
-    list.appendChild(sec);
-    var arr=byProj[proj];
-    for(var k=0;k<arr.length;k++){
-      var t=arr[k];
-      var el=document.createElement('div'); el.className="item";
-      el.innerHTML='<div class="short">'+t.short+'</div><div class="desc">'+escapeHtml(t.desc)+'</div>';
-      // place INSIDE its project/tag bubble (grid)
-      el.addEventListener('mousedown', (function(task){
-        return function(e){ if(e.button!==0) return; addToBuilder(task, null, null); };
-      })(t));
-      list.appendChild(el);
-    }
+    var arr=byProj[keys[i]];
+    rows.push({kind:'section', text:keys[i]+" ("+arr.length+")"});
+    for(var k=0;k<arr.length;k++) rows.push({kind:'item', task:arr[k]});
+  }
+  if(!filtered.length) rows.push({kind:'empty', text:"No tasks."});
+  LIST_ROWS=rows;
+  var h=listRowHeights(), tops=new Array(rows.length+1), y=0;
+  for(i=0;i<rows.length;i++){ tops[i]=y; y+=h[rows[i].kind]; }
+  tops[rows.length]=y;
+  LIST_TOPS=tops;
+  list.style.height=y+"px";
+  LIST_MOUNTED.forEach(function(el){ releaseListRow(el); });
+  LIST_MOUNTED.clear();
+  paintList();
+}
+function releaseListRow(el){
+  el.style.display="none";
+  LIST_POOL[el.__kind].push(el);
+}
+function listRowEl(kind){
+  var el=LIST_POOL[kind].pop();
+  if(el){ el.style.display=""; return el; }
+  el=document.createElement('div'); el.__kind=kind;
+  if(kind==='item'){
+    el.className="item vrow";
+    el.innerHTML='<div class="short"></div><div class="desc"></div>';
+  } else {
+    el.className=(kind==='section' ? "section" : "meta")+" vrow";
   }
-  if(!filtered.length){
-    var empty=document.createElement('div'); empty.className="meta"; empty.textContent="No tasks.";
-    list.appendChild(empty);
+  list.appendChild(el);
+  return el;
+}
+function paintList(){
+  listPaintQueued=false;
+  var rows=LIST_ROWS, tops=LIST_TOPS, n=rows.length;
+  if(!LIST_H && n){ listRowHeights(); if(LIST_H){ renderList(); return; } }
+  // list top relative to the visible part of #left (offsetTop would be from <body>: .left isn't positioned)
+  var view0=(left ? left.getBoundingClientRect().top+left.clientTop : 0)-list.getBoundingClientRect().top,
+      view1=view0+(left ? left.clientHeight : window.innerHeight);
+  var lo=0, hi=n;                       // first row whose bottom is below the top of the view
+  while(lo<hi){ var mid=(lo+hi)>>1; if(tops[mid+1]<=view0) lo=mid+1; else hi=mid; }
+  var first=Math.max(0, lo-LIST_OVERSCAN), last=first;
+  while(last<n && tops[last]<view1) last++;
+  last=Math.min(n, last+LIST_OVERSCAN);
+  LIST_MOUNTED.forEach(function(el, idx){
+    if(idx<first || idx>=last || el.__row!==rows[idx]){ releaseListRow(el); LIST_MOUNTED.delete(idx); }
+  });
+  for(var i=first;i<last;i++){
+    if(LIST_MOUNTED.has(i)) continue;
+    var r=rows[i], el=listRowEl(r.kind);
+    el.__row=r; el.__idx=i;
+    el.style.top=tops[i]+"px";
+    if(r.kind==='item'){
+      el.classList.toggle('ghost', !!r.task.ghost);
+      el.setAttribute('data-short', r.task.short);
+      el.firstChild.textContent=r.task.short;
+      el.lastChild.textContent=r.task.desc;
+    } else {
+      el.textContent=r.text;
+    }
+    LIST_MOUNTED.set(i, el);
   }
 }
+function queuePaintList(){
+  if(listPaintQueued) return;
+  listPaintQueued=true;
+  requestAnimationFrame(paintList);
+}
+// One delegated handler instead of a closure per row: place INSIDE its project/tag bubble (grid)
+list.addEventListener('mousedown', function(e){
+  if(e.button!==0) return;
+  var el=e.target.closest && e.target.closest('.item.vrow');
+  if(el && el.__row && el.__row.task) addToBuilder(el.__row.task, null, null);
+});
+if(left) left.addEventListener('scroll', queuePaintList, {passive:true});
+window.addEventListener('resize', queuePaintList);
+if(left && window.ResizeObserver) new ResizeObserver(queuePaintList).observe(left);
 
 /* ===== Keys & helpers ===== */
 function keyPT(project, tag){ return (project||"(no project)") + "||" + (tag||"(no tag)"); }
@@ -2863,7 +4819,7 @@ function recomputeAreasAndTags(){
       if (!desc) return;
       var uuid = "new-"+Date.now().toString(36)+Math.random().toString(36).slice(2,6);
       var t = { uuid:uuid, short:uuid.slice(0,8), desc:desc, project: ta.project, tags:[ta.tag], has_depends:false };
-      TASKS.push(t); TASK_BY_SHORT[t.short]=t;
+      TASKS.push(t); TASK_BY_SHORT[t.short]=t; searchIndexAdd(t);
       renderList();
       ensureTagArea(ta.project, ta.tag);
       addToBuilder(t, null, null);
@@ -3087,7 +5043,7 @@ function addNodeForTask(task, cx, cy, opts){
   recomputeAreasAndTags();
 
   var node = document.createElement('div');
-  node.className="node";
+  node.className = task.ghost ? "node ghost" : "node";   // ghost: outside --scope, pulled in as a dependency
   node.innerHTML = '<div class="title">'+escapeHtml(task.desc)+'</div><div class="caption">'+escapeHtml(proj+' • '+tag)+'</div>';
   node.setAttribute('data-short', task.short);
   node.setAttribute('data-proj', proj);
@@ -3163,6 +5119,10 @@ document.addEventListener('mouseup', function(e){
 /* ===== Viewer (dependent tasks only) ===== */
 function isDependentShort(shortId){
   if (!shortId) return false;
+  if (window.GRAPH_CSR){
+    var i = SHORT_INDEX[shortId];
+    return i != null && (csrDeps(i).length > 0 || csrParents(i).length > 0);
+  }
   if (PARENT_DEPS0 && PARENT_DEPS0[shortId] && PARENT_DEPS0[shortId].length) return true;
   if (CHILD_TO_PARENTS && CHILD_TO_PARENTS[shortId] && CHILD_TO_PARENTS[shortId].length) return true;
   return false;
@@ -3285,9 +5245,9 @@ function addFilteredTasks(){
   if (projectsOnCanvas.size===0){ alert("No projects on canvas. Add a project first."); return 0; }
   var added=0, skipped=0;
   var byPT = {};
-  for (var i=0;i<TASKS.length;i++){
-    var t=TASKS[i];
-    if(!matches(t,f)) continue;
+  var hits=searchTasks(f);
+  for (var i=0;i<hits.length;i++){
+    var t=hits[i];
     if (hideHasDeps && hideHasDeps.checked && t.has_depends) continue;
     var p = t.project || "(no project)";
     if (!projectsOnCanvas.has(p)){ skipped++; continue; }
@@ -3337,7 +5297,7 @@ fabAddNew.addEventListener('click', function(){
   var tags = tagsIn.split(",").map(function(s){return s.trim();}).filter(function(s){return s;});
   var uuid = "new-"+Date.now().toString(36)+Math.random().toString(36).slice(2,6);
   var t = { uuid:uuid, short:uuid.slice(0,8), desc:desc, project:project, tags:tags, has_depends:false };
-  TASKS.push(t); TASK_BY_SHORT[t.short]=t;
+  TASKS.push(t); TASK_BY_SHORT[t.short]=t; searchIndexAdd(t);
   renderList();
   if (projectAreas.has(project)){
     ensureTagArea(project, firstTag(t));
@@ -3389,17 +5349,22 @@ function initFromDATA(){
   try {
     var D = window.DATA || {};
     TASKS       = Array.isArray(D.tasks) ? D.tasks.slice() : [];
-    TASK_BY_SHORT = {}; INIT_MAIN_TAG = {}; INIT_PROJECT  = {};
+    TASK_BY_SHORT = {}; INIT_MAIN_TAG = {}; INIT_PROJECT  = {}; SHORT_INDEX = {};
     for (var i=0;i<TASKS.length;i++){
       TASK_BY_SHORT[TASKS[i].short]=TASKS[i];
+      SHORT_INDEX[TASKS[i].short]=i;
       INIT_MAIN_TAG[TASKS[i].short] = firstTag(TASKS[i]) || "(no tag)";
       INIT_PROJECT[TASKS[i].short]  = TASKS[i].project || "(no project)";
     }
     var G = (D.graph && typeof D.graph === "object") ? D.graph : {};
-    PARENT_DEPS0     = (G.parent_current_deps && typeof G.parent_current_deps === "object") ? G.parent_current_deps : {};
-    CHILD_TO_PARENTS = (G.child_to_parents && typeof G.child_to_parents === "object") ? G.child_to_parents : {};
+    window.GRAPH_CSR = G.csr || null;
+    if (!window.GRAPH_CSR){  // legacy payloads without CSR
+      PARENT_DEPS0     = (G.parent_current_deps && typeof G.parent_current_deps === "object") ? G.parent_current_deps : {};
+      CHILD_TO_PARENTS = (G.child_to_parents && typeof G.child_to_parents === "object") ? G.child_to_parents : {};
+    }
 
     if (parsedBadge) parsedBadge.textContent = "Parsed: " + TASKS.length;
+    buildSearchIndex();
     if (hideHasDeps) hideHasDeps.checked = false;
     if (q) q.value = "";
 
@@ -3408,7 +5373,7 @@ function initFromDATA(){
     // __EXISTING_SOLID_V3B__ boot edges inside init
     try {
       var G2 = (D.graph && typeof D.graph === 'object') ? D.graph : {};
-      window.EXIST_EDGES = (G2 && Array.isArray(G2.edges)) ? G2.edges.slice() : [];
+      setExistEdgesLazy(G2);
     } catch(_){ window.EXIST_EDGES = []; }
     try { if (typeof refreshDepHandleLetters === 'function') refreshDepHandleLetters(); } catch(_){}
     try { if (typeof drawLinks === 'function') drawLinks(); } catch(_){}
@@ -3825,6 +5790,7 @@ if(hideHasDeps) hideHasDeps.addEventListener('change', renderList);
     var i = raw.indexOf(' > task ');
     if (i !== -1){ raw = raw.slice(i+3).trim(); }
     return raw;
+  }
   function stripAugment(s){
     var lines = splitLines(s);
     var out=[];
@@ -5035,9 +7001,9 @@ if(hideHasDeps) hideHasDeps.addEventListener('change', renderList);
         }
       }
     }catch(_){}
-    // From EXIST_EDGES if present
+    // From EXIST_EDGES if present (only edges between placed nodes are counted)
     try{
-      var ex = window.EXIST_EDGES;
+      var ex = placedExistEdges();
       if (Array.isArray(ex)){
         for (i=0;i<ex.length;i++){ e=ex[i]; if(e&&e.from&&e.to) edges.push({from:String(e.from), to:String(e.to)}); }
       }
@@ -5162,7 +7128,7 @@ if(hideHasDeps) hideHasDeps.addEventListener('change', renderList);
       }
     }catch(_){}
     try{
-      var ex=window.EXIST_EDGES; if(Array.isArray(ex)){
+      var ex=placedExistEdges(); if(Array.isArray(ex)){
         for(i=0;i<ex.length;i++){ e=ex[i]; if(e&&e.from&&e.to) edges.push({from:String(e.from), to:String(e.to)}); }
       }
     }catch(_){}
@@ -5426,7 +7392,7 @@ if(hideHasDeps) hideHasDeps.addEventListener('change', renderList);
     // refresh only our group
     while (g.firstChild) g.removeChild(g.firstChild);
 
-    var ex = window.EXIST_EDGES || [];
+    var ex = placedExistEdges();
     for (var i=0;i<ex.length;i++){
       var e = ex[i]; if (!e || !e.from || !e.to) continue;
       var a = anchorParentLeft(e.from), b = anchorChildTop(e.to);
@@ -5692,7 +7658,8 @@ if(hideHasDeps) hideHasDeps.addEventListener('change', renderList);
 </script>
 </body></html>"""
 
-HTML = HTML.replace('</body>', '\n<!-- NEW_PROJECT_MODAL_V2_MINIMAL -->\n<script id="NEW_PROJECT_MODAL_V2_MINIMAL">\n(function(){\n  // Always prefer V2: neutralize any V1 guard and remove old fallback boxes\n  try{ delete window.__NEW_PROJECT_MODAL_V1__; }catch(_){}\n  function cleanupFallback(){\n    try{ document.querySelectorAll(\'.npProjBox, .projGhost\').forEach(function(n){ n.remove(); }); }catch(_){}\n  }\n\n  // Small, inline-styled modal to avoid needing CSS edits in the template\n  function showNewProjectModal(){\n    var ov = document.createElement(\'div\');\n    ov.style.position=\'fixed\'; ov.style.left=0; ov.style.top=0; ov.style.right=0; ov.style.bottom=0;\n    ov.style.background=\'rgba(0,0,0,.45)\'; ov.style.zIndex=40010;\n    ov.style.display=\'flex\'; ov.style.alignItems=\'center\'; ov.style.justifyContent=\'center\';\n\n    var box = document.createElement(\'div\');\n    box.style.width=\'min(560px,92vw)\'; box.style.maxWidth=\'92vw\';\n    box.style.background=\'#0f1525\'; box.style.color=\'var(--fg,#c9d1d9)\';\n    box.style.border=\'1px solid #2a3344\'; box.style.borderRadius=\'12px\';\n    box.style.boxShadow=\'0 18px 48px rgba(0,0,0,.5)\'; box.style.overflow=\'hidden\';\n\n    var head = document.createElement(\'div\');\n    head.textContent=\'Create new project\';\n    head.style.padding=\'12px\'; head.style.borderBottom=\'1px solid #202736\'; head.style.fontWeight=\'600\';\n\n    var body = document.createElement(\'div\');\n    body.style.padding=\'14px\'; body.style.display=\'flex\'; body.style.flexDirection=\'column\'; body.style.gap=\'10px\';\n    var lab = document.createElement(\'label\'); lab.textContent=\'Project name\';\n    var inp = document.createElement(\'input\');\n    inp.placeholder=\'e.g. Home.Renovation\';\n    inp.style.padding=\'10px 12px\'; inp.style.borderRadius=\'8px\'; inp.style.border=\'1px solid #2a3344\';\n    inp.style.background=\'#0e1320\'; inp.style.color=\'inherit\';\n\n    var foot = document.createElement(\'div\');\n    foot.style.padding=\'10px 12px\'; foot.style.borderTop=\'1px solid #202736\';\n    foot.style.display=\'flex\'; foot.style.justifyContent=\'flex-end\'; foot.style.gap=\'8px\';\n    var cancel = document.createElement(\'button\');\n    cancel.textContent=\'Cancel\';\n    cancel.style.padding=\'8px 10px\'; cancel.style.border=\'1px solid #2a3344\';\n    cancel.style.background=\'#121a2b\'; cancel.style.color=\'inherit\'; cancel.style.borderRadius=\'8px\';\n    var create = document.createElement(\'button\');\n    create.textContent=\'Create\';\n    create.style.padding=\'8px 10px\'; create.style.border=\'1px solid #2d3a55\';\n    create.style.background=\'#1b2945\'; create.style.color=\'inherit\'; create.style.borderRadius=\'8px\';\n\n    body.appendChild(lab); body.appendChild(inp);\n    foot.appendChild(cancel); foot.appendChild(create);\n    box.appendChild(head); box.appendChild(body); box.appendChild(foot);\n    ov.appendChild(box); document.body.appendChild(ov);\n\n    function close(){ try{ document.removeEventListener(\'keydown\', onKey); }catch(_){}\n      try{ ov.remove(); }catch(_){}\n    }\n    function onKey(e){ if(e.key===\'Escape\'){e.preventDefault();close();}\n                       else if(e.key===\'Enter\'){e.preventDefault();doCreate();} }\n\n    function centerIntoView(el){\n      try{\n        var cv = document.querySelector(\'#builderWrap .canvas\') || document.querySelector(\'.canvas\');\n        if (!cv || !el) return;\n        var cvr = cv.getBoundingClientRect(), er = el.getBoundingClientRect();\n        var dx = (er.left+er.width/2) - (cvr.left+cvr.width/2);\n        var dy = (er.top +er.height/2) - (cvr.top +cv.clientHeight/2);\n        cv.scrollTo({\n          left: Math.max(0, Math.min(cv.scrollWidth-cv.clientWidth,  cv.scrollLeft + dx)),\n          top:  Math.max(0, Math.min(cv.scrollHeight-cv.clientHeight, cv.scrollTop  + dy)),\n          behavior: \'smooth\'\n        });\n      }catch(_){}\n    }\n\n    function projectExists(name){\n      name=(name||\'\').trim(); if(!name) return false;\n      try{ if (window.projectAreas && typeof projectAreas.has===\'function\') return projectAreas.has(name); }catch(_){}\n      try{ return !!document.querySelector(\'.projArea[data-proj="\'+CSS.escape(name)+\'"]\'); }catch(_){ return !!document.querySelector(\'.projArea[data-proj="\'+name+\'"]\'); }\n    }\n\n    function doCreate(){\n      var name=(inp.value||\'\').trim(); if(!name){ inp.focus(); return; }\n      if (projectExists(name)){\n        try{ showToast && showToast(\'Project "\'+name+\'" already exists.\'); }catch(_){}\n        centerIntoView(document.querySelector(\'.projArea[data-proj="\'+(CSS?.escape?CSS.escape(name):name)+\'"]\'));\n        return;\n      }\n      try{ typeof ensureProjectArea===\'function\' && ensureProjectArea(name); }catch(_){}\n      try{ typeof recomputeAreasAndTags===\'function\' && recomputeAreasAndTags(); }catch(_){}\n      setTimeout(function(){\n        try{\n          var el = document.querySelector(\'.projArea[data-proj="\'+(CSS?.escape?CSS.escape(name):name)+\'"]\');\n          centerIntoView(el);\n          try{ showToast && showToast(\'Project "\'+name+\'" created.\'); }catch(_){}\n        }catch(_){}\n      },0);\n      close();\n    }\n\n    cancel.addEventListener(\'click\', close);\n    create.addEventListener(\'click\', doCreate);\n    setTimeout(function(){ try{ inp.focus(); }catch(_){} },0);\n    document.addEventListener(\'keydown\', onKey);\n  }\n\n  function normalize(s){ return (s||\'\').replace(/\\s+/g,\' \').trim().toLowerCase(); }\n\n  function rebindFAB(){\n    var menu = document.getElementById(\'fabMenu\') || document.querySelector(\'.fab-menu, #fab\');\n    var items = Array.from((menu||document).querySelectorAll(\'button, .item, [data-action]\'));\n    var target = null;\n\n    // If we already have a create-project entry, use it\n    target = items.find(function(el){ return (el.getAttribute(\'data-action\')||\'\').toLowerCase()===\'create-project\'; });\n    // Else hijack "Add new task"\n    if (!target){\n      target = items.find(function(el){\n        var t = normalize(el.textContent);\n        return t===\'add new task\' || t===\'add task\' || /add.*new.*task/.test(t);\n      });\n    }\n\n    if (target){\n      target.textContent = \'Add new project\';\n      target.setAttribute(\'data-action\',\'create-project\');\n      var c = target.cloneNode(true);\n      target.replaceWith(c);\n      c.addEventListener(\'click\', function(){\n        try{ (document.getElementById(\'fabMenu\')||window.fabMenu)?.classList.add(\'hidden\'); }catch(_){}\n        showNewProjectModal();\n      });\n    }else if(menu && !document.getElementById(\'fabCreateProject\')){\n      var btn=document.createElement(\'button\');\n      btn.id=\'fabCreateProject\'; btn.className=\'fab-item\'; btn.textContent=\'Add new project\';\n      btn.style.marginTop=\'8px\';\n      btn.addEventListener(\'click\', showNewProjectModal);\n      menu.appendChild(btn);\n    }\n  }\n\n  function boot(){\n    cleanupFallback();\n    rebindFAB();\n  }\n  if (document.readyState===\'loading\') document.addEventListener(\'DOMContentLoaded\', boot); else boot();\n})();\n</script>\n' + '\n</body>')
+# Applied when the static shell is built (see _build_static_shell)
+NEW_PROJECT_MODAL_V2_MINIMAL_JS = '\n<!-- NEW_PROJECT_MODAL_V2_MINIMAL -->\n<script id="NEW_PROJECT_MODAL_V2_MINIMAL">\n(function(){\n  // Always prefer V2: neutralize any V1 guard and remove old fallback boxes\n  try{ delete window.__NEW_PROJECT_MODAL_V1__; }catch(_){}\n  function cleanupFallback(){\n    try{ document.querySelectorAll(\'.npProjBox, .projGhost\').forEach(function(n){ n.remove(); }); }catch(_){}\n  }\n\n  // Small, inline-styled modal to avoid needing CSS edits in the template\n  function showNewProjectModal(){\n    var ov = document.createElement(\'div\');\n    ov.style.position=\'fixed\'; ov.style.left=0; ov.style.top=0; ov.style.right=0; ov.style.bottom=0;\n    ov.style.background=\'rgba(0,0,0,.45)\'; ov.style.zIndex=40010;\n    ov.style.display=\'flex\'; ov.style.alignItems=\'center\'; ov.style.justifyContent=\'center\';\n\n    var box = document.createElement(\'div\');\n    box.style.width=\'min(560px,92vw)\'; box.style.maxWidth=\'92vw\';\n    box.style.background=\'#0f1525\'; box.style.color=\'var(--fg,#c9d1d9)\';\n    box.style.border=\'1px solid #2a3344\'; box.style.borderRadius=\'12px\';\n    box.style.boxShadow=\'0 18px 48px rgba(0,0,0,.5)\'; box.style.overflow=\'hidden\';\n\n    var head = document.createElement(\'div\');\n    head.textContent=\'Create new project\';\n    head.style.padding=\'12px\'; head.style.borderBottom=\'1px solid #202736\'; head.style.fontWeight=\'600\';\n\n    var body = document.createElement(\'div\');\n    body.style.padding=\'14px\'; body.style.display=\'flex\'; body.style.flexDirection=\'column\'; body.style.gap=\'10px\';\n    var lab = document.createElement(\'label\'); lab.textContent=\'Project name\';\n    var inp = document.createElement(\'input\');\n    inp.placeholder=\'e.g. Home.Renovation\';\n    inp.style.padding=\'10px 12px\'; inp.style.borderRadius=\'8px\'; inp.style.border=\'1px solid #2a3344\';\n    inp.style.background=\'#0e1320\'; inp.style.color=\'inherit\';\n\n    var foot = document.createElement(\'div\');\n    foot.style.padding=\'10px 12px\'; foot.style.borderTop=\'1px solid #202736\';\n    foot.style.display=\'flex\'; foot.style.justifyContent=\'flex-end\'; foot.style.gap=\'8px\';\n    var cancel = document.createElement(\'button\');\n    cancel.textContent=\'Cancel\';\n    cancel.style.padding=\'8px 10px\'; cancel.style.border=\'1px solid #2a3344\';\n    cancel.style.background=\'#121a2b\'; cancel.style.color=\'inherit\'; cancel.style.borderRadius=\'8px\';\n    var create = document.createElement(\'button\');\n    create.textContent=\'Create\';\n    create.style.padding=\'8px 10px\'; create.style.border=\'1px solid #2d3a55\';\n    create.style.background=\'#1b2945\'; create.style.color=\'inherit\'; create.style.borderRadius=\'8px\';\n\n    body.appendChild(lab); body.appendChild(inp);\n    foot.appendChild(cancel); foot.appendChild(create);\n    box.appendChild(head); box.appendChild(body); box.appendChild(foot);\n    ov.appendChild(box); document.body.appendChild(ov);\n\n    function close(){ try{ document.removeEventListener(\'keydown\', onKey); }catch(_){}\n      try{ ov.remove(); }catch(_){}\n    }\n    function onKey(e){ if(e.key===\'Escape\'){e.preventDefault();close();}\n                       else if(e.key===\'Enter\'){e.preventDefault();doCreate();} }\n\n    function centerIntoView(el){\n      try{\n        var cv = document.querySelector(\'#builderWrap .canvas\') || document.querySelector(\'.canvas\');\n        if (!cv || !el) return;\n        var cvr = cv.getBoundingClientRect(), er = el.getBoundingClientRect();\n        var dx = (er.left+er.width/2) - (cvr.left+cvr.width/2);\n        var dy = (er.top +er.height/2) - (cvr.top +cv.clientHeight/2);\n        cv.scrollTo({\n          left: Math.max(0, Math.min(cv.scrollWidth-cv.clientWidth,  cv.scrollLeft + dx)),\n          top:  Math.max(0, Math.min(cv.scrollHeight-cv.clientHeight, cv.scrollTop  + dy)),\n          behavior: \'smooth\'\n        });\n      }catch(_){}\n    }\n\n    function projectExists(name){\n      name=(name||\'\').trim(); if(!name) return false;\n      try{ if (window.projectAreas && typeof projectAreas.has===\'function\') return projectAreas.has(name); }catch(_){}\n      try{ return !!document.querySelector(\'.projArea[data-proj="\'+CSS.escape(name)+\'"]\'); }catch(_){ return !!document.querySelector(\'.projArea[data-proj="\'+name+\'"]\'); }\n    }\n\n    function doCreate(){\n      var name=(inp.value||\'\').trim(); if(!name){ inp.focus(); return; }\n      if (projectExists(name)){\n        try{ showToast && showToast(\'Project "\'+name+\'" already exists.\'); }catch(_){}\n        centerIntoView(document.querySelector(\'.projArea[data-proj="\'+(CSS?.escape?CSS.escape(name):name)+\'"]\'));\n        return;\n      }\n      try{ typeof ensureProjectArea===\'function\' && ensureProjectArea(name); }catch(_){}\n      try{ typeof recomputeAreasAndTags===\'function\' && recomputeAreasAndTags(); }catch(_){}\n      setTimeout(function(){\n        try{\n          var el = document.querySelector(\'.projArea[data-proj="\'+(CSS?.escape?CSS.escape(name):name)+\'"]\');\n          centerIntoView(el);\n          try{ showToast && showToast(\'Project "\'+name+\'" created.\'); }catch(_){}\n        }catch(_){}\n      },0);\n      close();\n    }\n\n    cancel.addEventListener(\'click\', close);\n    create.addEventListener(\'click\', doCreate);\n    setTimeout(function(){ try{ inp.focus(); }catch(_){} },0);\n    document.addEventListener(\'keydown\', onKey);\n  }\n\n  function normalize(s){ return (s||\'\').replace(/\\s+/g,\' \').trim().toLowerCase(); }\n\n  function rebindFAB(){\n    var menu = document.getElementById(\'fabMenu\') || document.querySelector(\'.fab-menu, #fab\');\n    var items = Array.from((menu||document).querySelectorAll(\'button, .item, [data-action]\'));\n    var target = null;\n\n    // If we already have a create-project entry, use it\n    target = items.find(function(el){ return (el.getAttribute(\'data-action\')||\'\').toLowerCase()===\'create-project\'; });\n    // Else hijack "Add new task"\n    if (!target){\n      target = items.find(function(el){\n        var t = normalize(el.textContent);\n        return t===\'add new task\' || t===\'add task\' || /add.*new.*task/.test(t);\n      });\n    }\n\n    if (target){\n      target.textContent = \'Add new project\';\n      target.setAttribute(\'data-action\',\'create-project\');\n      var c = target.cloneNode(true);\n      target.replaceWith(c);\n      c.addEventListener(\'click\', function(){\n        try{ (document.getElementById(\'fabMenu\')||window.fabMenu)?.classList.add(\'hidden\'); }catch(_){}\n        showNewProjectModal();\n      });\n    }else if(menu && !document.getElementById(\'fabCreateProject\')){\n      var btn=document.createElement(\'button\');\n      btn.id=\'fabCreateProject\'; btn.className=\'fab-item\'; btn.textContent=\'Add new project\';\n      btn.style.marginTop=\'8px\';\n      btn.addEventListener(\'click\', showNewProjectModal);\n      menu.appendChild(btn);\n    }\n  }\n\n  function boot(){\n    cleanupFallback();\n    rebindFAB();\n  }\n  if (document.readyState===\'loading\') document.addEventListener(\'DOMContentLoaded\', boot); else boot();\n})();\n</script>\n'
 
 def open_file(path: Path):
     try:
@@ -5749,6 +7716,125 @@ def inject_wire_deps_as_main(html: str) -> str:
     return html
 
 
+# Hover card / drawer item → tooltip with the heavy fields from --fields.
+# The tc_fields_K JSON blocks are parsed one chunk at a time, the first time a
+# task in that chunk is hovered, or all at once on the first free-text search.
+LAZY_FIELDS_JS = r"""
+<style id="FEATURE_LAZY_FIELDS_V1_CSS">
+  #tcFieldsTip{position:fixed; z-index:99990; max-width:420px; pointer-events:none; display:none;
+    background:#0f1525; color:var(--fg,#c9d1d9); border:1px solid #2a3344; border-radius:8px;
+    padding:8px 10px; font:12px/1.4 ui-sans-serif,system-ui,sans-serif; box-shadow:0 8px 24px rgba(0,0,0,.45)}
+  #tcFieldsTip .k{opacity:.7} #tcFieldsTip ul{margin:4px 0 0 16px; padding:0}
+</style>
+<script id="FEATURE_LAZY_FIELDS_V1">(function(){
+  if (window.__LAZY_FIELDS_V1__) return; window.__LAZY_FIELDS_V1__ = true;
+  var CHUNKS = Object.create(null), TEXT = Object.create(null);
+
+  function meta(){ return (window.DATA && window.DATA.fields) || null; }
+  function chunk(k){
+    if (k in CHUNKS) return CHUNKS[k];
+    var el = document.getElementById('tc_fields_' + k), rows = [];
+    try{ rows = el ? JSON.parse(el.textContent) : []; }catch(_){}
+    return (CHUNKS[k] = rows);
+  }
+  function indexOf(t){
+    var i = (t && window.SHORT_INDEX) ? SHORT_INDEX[t.short] : null;
+    return (i == null) ? -1 : i;
+  }
+  window.taskFields = function(t){
+    var M = meta(), i = indexOf(t);
+    if (!M || i < 0) return null;
+    return chunk(Math.floor(i / M.chunk))[i % M.chunk] || null;
+  };
+  window.taskFieldsText = function(t){
+    var i = indexOf(t);
+    if (!meta() || i < 0) return '';
+    if (i in TEXT) return TEXT[i];
+    var f = taskFields(t), parts = [];
+    if (f) for (var k in f){ var v = f[k]; parts.push(Array.isArray(v) ? v.join(' ') : String(v)); }
+    return (TEXT[i] = parts.join(' ').toLowerCase());
+  };
+
+  var tip = null;
+  function ensureTip(){
+    if (!tip){ tip = document.createElement('div'); tip.id = 'tcFieldsTip'; document.body.appendChild(tip); }
+    return tip;
+  }
+  function renderTip(f){
+    var M = meta(), html = [];
+    (M.names || Object.keys(f)).forEach(function(k){
+      if (!(k in f)) return;
+      var v = f[k];
+      if (Array.isArray(v)){
+        html.push('<div><span class="k">' + escapeHtml(k) + '</span><ul>' +
+          v.map(function(x){ return '<li>' + escapeHtml(x) + '</li>'; }).join('') + '</ul></div>');
+      } else {
+        if (k === 'urgency' && typeof v === 'number') v = v.toFixed(2);
+        html.push('<div><span class="k">' + escapeHtml(k) + ':</span> ' + escapeHtml(v) + '</div>');
+      }
+    });
+    return html.join('');
+  }
+  function taskFromEl(el){
+    var s = el.getAttribute('data-short');
+    if (!s){ var sh = el.querySelector('.short'); s = sh ? sh.textContent.trim() : ''; }
+    return (window.TASK_BY_SHORT && TASK_BY_SHORT[s]) || null;
+  }
+  document.addEventListener('mouseover', function(e){
+    if (!meta() || !e.target.closest) return;
+    var el = e.target.closest('.node[data-short], #list .item');
+    if (!el) return;
+    var f = taskFields(taskFromEl(el));
+    if (!f || !Object.keys(f).length) return;
+    var t = ensureTip();
+    t.innerHTML = renderTip(f);
+    t.style.display = 'block';
+    var r = el.getBoundingClientRect();
+    t.style.left = Math.min(window.innerWidth - 430, r.right + 8) + 'px';
+    t.style.top = Math.max(8, r.top) + 'px';
+  });
+  document.addEventListener('mouseout', function(e){
+    if (!tip || !e.target.closest) return;
+    var el = e.target.closest('.node[data-short], #list .item');
+    if (el && !(e.relatedTarget && el.contains(e.relatedTarget))) tip.style.display = 'none';
+  });
+})();</script>
+""".strip("\n")
+
+def inject_lazy_fields(html: str) -> str:
+    """Append LAZY_FIELDS_JS before </body> unless already present."""
+    if "FEATURE_LAZY_FIELDS_V1" not in html:
+        html = html.replace("</body>", LAZY_FIELDS_JS + "\n</body>")
+    return html
+
+def _extract_flags(argv, *names):
+    """Pull boolean flags (e.g. --columnar) out of argv, return (set_of_present_flags, remaining_args)."""
+    found, out = set(), []
+    for a in argv:
+        if a in names:
+            found.add(a)
+        else:
+            out.append(a)
+    return found, out
+
+def _extract_option(argv, name, default=None):
+    """Pull a valued option (`--name VALUE` or `--name=VALUE`) out of argv, return (value, remaining_args)."""
+    val, out, skip = default, [], False
+    for i, a in enumerate(argv):
+        if skip:
+            skip = False
+            continue
+        if a == name:
+            if i + 1 < len(argv):
+                val = argv[i + 1]; skip = True
+            else:
+                val = ""
+        elif a.startswith(name + "="):
+            val = a.split("=", 1)[1]
+        else:
+            out.append(a)
+    return val, out
+
 def _extract_bg_args(argv):
     """Parse --bg=FILE and --bg-opacity=0.00, return (bg_path_str, opacity_str, remaining_args)."""
     bg = None
@@ -5795,24 +7881,23 @@ def _find_bg_file(prefer: str | None):
             return p
     return None
 
-def inject_custom_background(html: str, img_path, opacity: str | None = None) -> str:
+def custom_background_css(img_path, opacity: str | None = None) -> str:
     """
-    Ensures the background image is next to OUT_HTML and injects a <style> overlay.
+    Ensures the background image is next to OUT_HTML and returns the <style> overlay.
     Uses a body::before fixed cover layer with adjustable opacity.
     """
-    import re, shutil
-    try:
-        out_dir = OUT_HTML.parent  # uses existing OUT_HTML
-        out_img = out_dir / img_path.name
-        if img_path.resolve() != out_img.resolve():
-            try:
-                out_dir.mkdir(parents=True, exist_ok=True)
-                shutil.copyfile(str(img_path), str(out_img))
-                eprint(f"[TaskCanvas] Copied bg → {out_img.name}")
-            except Exception as e:
-                eprint(f"[TaskCanvas] Copy bg failed: {e}; will still reference original name.")
-        op = opacity if (opacity and opacity.strip()) else "0.18"
-        css = f"""
+    import shutil
+    out_dir = OUT_HTML.parent  # uses existing OUT_HTML
+    out_img = out_dir / img_path.name
+    if img_path.resolve() != out_img.resolve():
+        try:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(str(img_path), str(out_img))
+            eprint(f"[TaskCanvas] Copied bg → {out_img.name}")
+        except Exception as e:
+            eprint(f"[TaskCanvas] Copy bg failed: {e}; will still reference original name.")
+    op = opacity if (opacity and opacity.strip()) else "0.18"
+    return f"""
 <style id="FEATURE_CUSTOM_BG_V1">
   html,body{{background:var(--bg);}}
   body{{position:relative;}}
@@ -5825,6 +7910,12 @@ def inject_custom_background(html: str, img_path, opacity: str | None = None) ->
   }}
   .app{{position:relative; z-index:1;}}
 </style>""".strip()
+
+def inject_custom_background(html: str, img_path, opacity: str | None = None) -> str:
+    """Injects custom_background_css() before </head> (or at the top when there is no head)."""
+    import re
+    try:
+        css = custom_background_css(img_path, opacity)
         if re.search(r'</head\s*>', html, flags=re.I):
             return re.sub(r'</head\s*>', css + '\n</head>', html, count=1, flags=re.I)
         else:
@@ -5833,49 +7924,12 @@ def inject_custom_background(html: str, img_path, opacity: str | None = None) ->
         eprint(f"[TaskCanvas] custom bg inject failed: {e}")
         return html
 
-def main():
-    raw_args = sys.argv[1:]
-    filter_str, args_wo_filter = _extract_filter_arg(raw_args)
-
-    # 1) Load ALL pending tasks for the payload (drawer/search, etc.)
-    tasks_all = fetch_tasks(None)
-
-    # 2) If filter is present, run it separately and capture just the UUIDs to auto-place
-    init_task_uuids = []
-    if filter_str:
-        filtered = fetch_tasks(filter_str)
-        init_task_uuids = [t["uuid"] for t in filtered]
-
-    # 3) Build payload using *all* tasks
-    payload = build_payload(tasks_all)
-    json_text = _json_text(payload)
-
-    # 4) Merge selector/positional args (these are still supported)
-    init_projects = []
-    if any(a == "--selector" for a in args_wo_filter):
-        try:
-            init_projects = run_project_selector(tasks_all)
-        except Exception as e:
-            print(f"[selector] error: {e}")
-
-    extra = [a for a in args_wo_filter if a and not a.startswith("-")]
-    if extra:
-        seen = set(init_projects)
-        for p in extra:
-            if p not in seen:
-                init_projects.append(p); seen.add(p)
-
-    # 5) Store initial placements into payload
-    changed = False
-    if init_projects:
-        payload["init_projects"] = init_projects
-        changed = True
-    if init_task_uuids:
-        payload["init_task_uuids"] = init_task_uuids 
-        changed = True
-    if changed:
-        json_text = _json_text(payload)
-
+def _build_static_shell():
+    """
+    Template + every static feature injector, run once per script version.
+    Per-run content is left as <!--TC_SLOT:name--> markers: `payload` (decoder,
+    field chunks, payload, runner), `head` (end of <head>), `body_end` (end of <body>).
+    """
     def _to_js_chunks(s, chunk=8000):
         esc = (
             s.replace("\\", "\\\\")
@@ -5887,43 +7941,11 @@ def main():
         )
         return [esc[i:i+chunk] for i in range(0, len(esc), chunk)] if esc else []
 
-    html = HTML.replace("<!-- INLINE_PAYLOAD_HERE -->", "")
-    
-    # Append JSON payload at end of body (robust)
-    safe_json = json_text.replace("</script", "<\/script")
-    payload_tag = ("<script id='payload_data' type='application/json'>" + safe_json + "</script>\n")
-    runner = """<script>(function(){
-      try{
-        var el = document.getElementById('payload_data');
-        var raw = el ? el.textContent : '';
-        window.__RAW_LEN__ = raw.length;
-        console.log('[payload] raw length (end) =', window.__RAW_LEN__);
-        window.DATA = JSON.parse(raw);
-        window.DATA_READY = true;
-        var tlen = (window.DATA && Array.isArray(window.DATA.tasks)) ? window.DATA.tasks.length : 0;
-        console.log('[payload] tasks =', tlen);
-        try { document.dispatchEvent(new CustomEvent('twdata')); } catch(_) {}
-    try {
-      if (!window.__INIT_DONE__ && typeof initFromDATA==='function') {
-        window.__INIT_DONE__ = true;
-        console.log('[payload] calling initFromDATA directly');
-        initFromDATA();
-      }
-    } catch(e) { console.log('[payload] initFromDATA error', e); }
-    try {
-      if (!window.__INIT_DONE__ && typeof initFromDATA==='function') {
-        window.__INIT_DONE__ = true;
-        console.log('[payload] calling initFromDATA directly');
-        initFromDATA();
-      }
-    } catch(e) { console.log('[payload] initFromDATA error', e); }
-      } catch(e){
-        console.log('[payload] parse error', e);
-        window.DATA = {tasks:[],graph:{}}; window.DATA_READY = false;
-      }
-    })();</script>
-    """
-    html = html.replace("</body>", payload_tag + runner + "</body>")
+    html = HTML.replace("</body>", NEW_PROJECT_MODAL_V2_MINIMAL_JS + '\n</body>')
+    html = html.replace("<!-- INLINE_PAYLOAD_HERE -->", "")
+
+    # Payload + runner go here at render time (before every feature script below)
+    html = html.replace("</body>", "<!--TC_SLOT:payload-->" + "</body>")
 
     # --- Feature: hover actions + staging & due badge (inline) ---
     CSS_HOVER = r'''<style id="feature-hover-css">
@@ -6489,7 +8511,7 @@ def main():
   // Build combined edge list in SHORT ids (existing + staged)
   function gatherEdgesShort(){
     var maps = domMaps(), out=[], i, e;
-    var ex = window.EXIST_EDGES || [];
+    var ex = placedExistEdges();
     for (i=0;i<ex.length;i++){
       e = ex[i]; if (!e) continue;
       var fs = toShort(e.from, maps), ts = toShort(e.to, maps);
@@ -6782,35 +8804,644 @@ def main():
 
     if "<!-- INLINE_PAYLOAD_HERE -->" in html:
             eprint("[TaskCanvas] ERROR: placeholder was not replaced in HTML")
-    else:
-        eprint(f"[TaskCanvas] Embedded tasks: {len(tasks_all)}")
 
     
-    html = inject_wire_deps_as_main(html)
-    html = _append_remove_mode(html) 
-    html = inject_hover_console_features(html)
-    html = inject_multiline_add(html)
-    html = inject_newtask_console_sync(html)
-    html = inject_console_hotkey_patch(html)
-    html = inject_staged_deps_color_split(html)
-    html = inject_follow_edges_on_move(html)
-    html = inject_actionable_beacon(html)
+    for inject in (inject_wire_deps_as_main, _append_remove_mode, inject_hover_console_features,
+                   inject_multiline_add, inject_newtask_console_sync, inject_console_hotkey_patch,
+                   inject_staged_deps_color_split, inject_follow_edges_on_move, inject_actionable_beacon):
+        with profile_span(inject.__name__, "inject"):
+            html = inject(html)
+
+    html = re.sub(r'</head\s*>', lambda m: "<!--TC_SLOT:head-->" + m.group(0), html, count=1, flags=re.I)
+    html = html.replace("</body>", "<!--TC_SLOT:body_end-->" + "</body>")
+    return html
+
+_SLOT_RE = re.compile(r"<!--TC_SLOT:(\w+)-->")
+
+_ASSET_RE = re.compile(r"<(script|style)\b([^>]*)>(.*?)</\1\s*>", re.S | re.I)
+
+def _split_assets(html):
+    """
+    Move every inline <script>/<style> of the shell into one JS and one CSS bundle,
+    in document order. The stylesheet <link> takes the place of the first <style>,
+    the bundle <script src> the place of the last <script> (so it runs after all
+    markup and after the payload slot). Returns (html, {filename: text}).
+    """
+    import hashlib
+    js, css = [], []
+    def pull(m):
+        tag, attrs, body = m.group(1).lower(), m.group(2), m.group(3)
+        if tag == "style":
+            css.append(body.strip("\n"))
+            return "\x00C"
+        if "src=" in attrs or re.search(r"type=['\"](?!text/javascript)", attrs):
+            return m.group(0)        # external or data blocks stay in the page
+        sid = re.search(r"id=['\"]([^'\"]+)", attrs)
+        js.append(f"/* {sid.group(1) if sid else 'inline'} */\n" + body.strip("\n") + "\n;")
+        return "\x00S"
+    html = _ASSET_RE.sub(pull, html)
+    js_text, css_text = "\n".join(js) + "\n", "\n".join(css) + "\n"
+    name = lambda text, ext: f"TaskCanvas.assets.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}.{ext}"
+    js_name, css_name = name(js_text, "js"), name(css_text, "css")
+    first_c, last_s = html.find("\x00C"), html.rfind("\x00S")
+    html = (html[:last_s] + f'<script src="{js_name}"></script>' + html[last_s + 2:]) if last_s >= 0 else html
+    html = (html[:first_c] + f'<link rel="stylesheet" href="{css_name}">' + html[first_c + 2:]) if first_c >= 0 else html
+    html = re.sub(r"\x00[CS]\n?", "", html)
+    return html, {js_name: js_text, css_name: css_text}
+
+def static_shell_parts(use_cache=True, assets=False):
+    """
+    The static shell pre-split at its slot markers: ([text, slot, text, slot, …, text], asset_files).
+    Cached on disk keyed by the hash of this script, so only a code change rebuilds it.
+    With assets=True the scripts/styles are split out into asset_files ({filename: text}).
+    """
+    import hashlib
+    key = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    path = CACHE_DIR / f"shell-{key}{'-assets' if assets else ''}.json"
+    if use_cache:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                cached = json.load(fh)
+            return cached["parts"], cached["assets"]
+        except (OSError, ValueError, KeyError):
+            pass
+    with profile_span("_build_static_shell"):
+        html = _build_static_shell()
+    files = {}
+    if assets:
+        # decoder/runner and the (guarded, data-driven) lazy-fields script are static: bundle them too
+        html = html.replace("<!--TC_SLOT:payload-->", PAYLOAD_DECODER_JS + "<!--TC_SLOT:payload-->" + PAYLOAD_RUNNER_JS, 1)
+        i = html.rfind("</body>")
+        html = html[:i] + LAZY_FIELDS_JS + "\n" + html[i:]
+        html, files = _split_assets(html)
+    parts = _SLOT_RE.split(html)
+    if use_cache:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for old in CACHE_DIR.glob("shell-*.json"):   # one shell per script version is enough
+                if not old.name.startswith(f"shell-{key}"):
+                    old.unlink(missing_ok=True)
+            tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"parts": parts, "assets": files}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            eprint(f"[TaskCanvas] shell cache write failed: {e}")
+    return parts, files
+
+def write_assets(files):
+    """
+    Write the content-addressed bundle next to OUT_HTML (skipped when already there,
+    so the browser keeps its cached, compiled copy) and drop bundles of older versions.
+    """
+    out_dir = OUT_HTML.parent
+    for name, text in files.items():
+        p = out_dir / name
+        if not p.is_file():
+            tmp = p.with_name(p.name + f".{os.getpid()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, p)
+            eprint(f"[TaskCanvas] Wrote asset bundle {name}")
+    for p in out_dir.glob("TaskCanvas.assets.*"):
+        if p.name not in files and p.suffix in (".js", ".css"):
+            p.unlink(missing_ok=True)
+
+def _page_pieces(parts, slots):
+    """Shell text interleaved with each slot's fragments (a fragment is a string or an iterable of strings)."""
+    for i, part in enumerate(parts):
+        if not i % 2:
+            yield part
+            continue
+        for frag in slots.get(part, ()):
+            if isinstance(frag, str):
+                yield frag
+            else:
+                yield from frag
+
+def assemble_page(parts, slots):
+    """Emit the page in one pass: shell text interleaved with each slot's fragments."""
+    return "".join(_page_pieces(parts, slots))
+
+def _iter_json(obj, batch=1024):
+    """
+    json.dumps(obj, ensure_ascii=False) in pieces: dicts are walked, long lists
+    dumped `batch` items at a time, everything else dumped whole.
+    """
+    if isinstance(obj, dict):
+        yield "{"
+        for i, (k, v) in enumerate(obj.items()):
+            yield (", " if i else "") + json.dumps(str(k), ensure_ascii=False) + ": "
+            yield from _iter_json(v, batch)
+        yield "}"
+    elif isinstance(obj, (list, tuple)) and len(obj) > batch:
+        yield "["
+        for i in range(0, len(obj), batch):
+            yield (", " if i else "") + json.dumps(obj[i:i + batch], ensure_ascii=False)[1:-1]
+        yield "]"
+    else:
+        yield json.dumps(obj, ensure_ascii=False)
+
+def payload_fragment(json_text, *, field_chunks=(), compress=False, scripts=True):
+    """
+    Everything that goes in the `payload` slot for one run (scripts=False: data blocks only).
+    `json_text` may also be the payload dict itself: it's then serialized piecewise as the page is emitted.
+    """
+    if compress and not isinstance(json_text, str):
+        json_text = _json_text(json_text)
+    # Append JSON payload at end of body (robust)
+    if compress:
+        # gzip+base64; the page inflates it (DecompressionStream, else tcInflate)
+        payload_tag = ["<script id='payload_data' type='application/gzip+base64'>"
+                       + _gzip_b64(json_text) + "</script>\n"]
+    else:
+        # "<\/" is a valid JSON escape and can't end the <script> (any case of </script)
+        if isinstance(json_text, str):
+            safe_json = json_text.replace("</", "<\\/")
+        else:
+            safe_json = (piece.replace("</", "<\\/") for piece in _iter_json(json_text))
+        payload_tag = ["<script id='payload_data' type='application/json'>", safe_json, "</script>\n"]
+    if not scripts:
+        return [_field_chunk_tags(field_chunks), *payload_tag]
+    return [PAYLOAD_DECODER_JS, _field_chunk_tags(field_chunks), *payload_tag, PAYLOAD_RUNNER_JS]
+
+def _page_parts(json_text, field_chunks, compress, head, tail, use_cache, assets):
+    """(shell parts, slots) for one page; see render_page."""
+    with profile_span("static_shell_parts"):
+        parts, files = static_shell_parts(use_cache, assets)
+    if files:
+        with profile_span("write_assets"):
+            write_assets(files)
+    slots = {
+        "payload": payload_fragment(json_text, field_chunks=field_chunks, compress=compress, scripts=not assets),
+        "head": list(head),
+        "body_end": ([LAZY_FIELDS_JS + "\n"] if (field_chunks and not assets) else []) + list(tail),
+    }
+    return parts, slots
+
+def render_page(json_text, *, field_chunks=(), compress=False, head=(), tail=(), use_cache=True, assets=False):
+    """
+    Build the full TaskCanvas page around an already-serialized payload: the
+    cached static shell plus this run's payload, extra <head> fragments
+    (e.g. custom_background_css), extra end-of-<body> fragments and the
+    lazy-fields script when needed.
+    assets=True references the external TaskCanvas.assets.<hash>.js/.css bundle instead.
+    """
+    return assemble_page(*_page_parts(json_text, field_chunks, compress, head, tail, use_cache, assets))
+
+def write_page(path, payload, *, field_chunks=(), compress=False, head=(), tail=(), use_cache=True, assets=False):
+    """
+    render_page() streamed into `path` for a payload dict: the JSON is produced
+    piece by piece as the file is written, so neither it nor the page is held
+    in memory whole. Written to a temp file and renamed into place.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.writelines(_page_pieces(*_page_parts(payload, field_chunks, compress, head, tail, use_cache, assets)))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+# --serve: in-place data updates. tcApplyData(D) swaps in a whole new payload,
+# tcApplyDelta(d) applies one /events delta; neither touches the canvas layout:
+# placed nodes keep their position unless their project/main tag changed in the
+# data, nodes of tasks that are gone are removed, and tasks created on the page
+# ('new-…' uuids) are kept. While the event stream is up, /payload polling pauses.
+SERVE_JS = r"""<script id="FEATURE_SERVE_REFRESH_V1">(function(){
+  if (window.__SERVE_REFRESH_V1__) return; window.__SERVE_REFRESH_V1__ = true;
+  if (!/^https?:$/.test(location.protocol)) return;
+  var etag = window.__TC_PAYLOAD_ETAG__ || null, seq = window.__TC_SEQ__ || 0, busy = false, last = 0, live = false;
+
+  function call(name){ try{ if (typeof window[name] === 'function') window[name](); }catch(_){} }
+  function redraw(){
+    if (parsedBadge) parsedBadge.textContent = "Parsed: " + TASKS.filter(function(t){ return String(t.uuid || '').indexOf('new-') !== 0; }).length;
+    call('renderList'); call('refreshDepHandleLetters'); call('drawLinks'); call('updateConsole');
+    try { document.dispatchEvent(new CustomEvent('twrefresh')); } catch(_) {}
+  }
+  function nodeFor(s){
+    try{ return builderStage.querySelector('.node[data-short="' + CSS.escape(s) + '"]'); }catch(_){ return null; }
+  }
+  function setInit(t){
+    INIT_MAIN_TAG[t.short] = firstTag(t) || "(no tag)";
+    INIT_PROJECT[t.short]  = t.project || "(no project)";
+  }
+  // Update a placed node after its task changed; re-place it only when the data moved it
+  // (oldProj/oldTag = what INIT_* said before), so staged moves on the canvas survive.
+  function syncNode(n, t, oldProj, oldTag){
+    if (!t){ n.remove(); return; }
+    if ((oldProj != null && oldProj !== (t.project || "(no project)")) || (oldTag != null && oldTag !== firstTag(t))){
+      n.remove();
+      try{ addNodeForTask(t, null, null); }catch(_){}
+      return;
+    }
+    var title = n.querySelector('.title');
+    if (title && title.textContent !== t.desc) title.textContent = t.desc;
+  }
+
+  window.tcApplyData = function(D){
+    if (typeof window.decodePayload === 'function') D = window.decodePayload(D);
+    var local = (TASKS || []).filter(function(t){ return String(t.uuid || '').indexOf('new-') === 0; });
+    var old = window.DATA || {}, oldProj = INIT_PROJECT, oldTag = INIT_MAIN_TAG;
+    if (old.fields && !D.fields) delete old.fields;    // field chunks in the page no longer line up
+    window.DATA = D;
+    TASKS = (Array.isArray(D.tasks) ? D.tasks.slice() : []).concat(local);
+    TASK_BY_SHORT = {}; SHORT_INDEX = {}; INIT_MAIN_TAG = {}; INIT_PROJECT = {};
+    for (var i = 0; i < TASKS.length; i++){
+      var t = TASKS[i];
+      TASK_BY_SHORT[t.short] = t;
+      if (i < TASKS.length - local.length) SHORT_INDEX[t.short] = i;
+      setInit(t);
+    }
+    var G = (D.graph && typeof D.graph === "object") ? D.graph : {};
+    window.GRAPH_CSR = G.csr || null;
+    if (!window.GRAPH_CSR){
+      PARENT_DEPS0     = (G.parent_current_deps && typeof G.parent_current_deps === "object") ? G.parent_current_deps : {};
+      CHILD_TO_PARENTS = (G.child_to_parents && typeof G.child_to_parents === "object") ? G.child_to_parents : {};
+    }
+    setExistEdgesLazy(G);
+    document.querySelectorAll('#builderStage .node[data-short]').forEach(function(n){
+      var s = n.getAttribute('data-short');
+      syncNode(n, TASK_BY_SHORT[s], oldProj[s], oldTag[s]);
+    });
+    redraw();
+  };
+
+  // CSR rows are index-based and deltas shift indices: switch to the short-keyed maps once
+  function useMaps(){
+    if (!window.GRAPH_CSR) return;
+    var G = (window.DATA && window.DATA.graph) || {}, copy = function(m){
+      var o = {}; Object.keys(m || {}).forEach(function(k){ o[k] = m[k].slice(); }); return o;
+    };
+    PARENT_DEPS0 = copy(G.parent_current_deps); CHILD_TO_PARENTS = copy(G.child_to_parents);
+    window.GRAPH_CSR = null;
+  }
+  function link(m, a, b, on){
+    var row = m[a] || [], i = row.indexOf(b);
+    if (on && i < 0){ row.push(b); row.sort(); m[a] = row; }
+    if (!on && i >= 0){ row.splice(i, 1); if (!row.length) delete m[a]; }
+  }
+
+  window.tcApplyDelta = function(d){
+    useMaps();
+    (d['delete'] || []).forEach(function(s){
+      var t = TASK_BY_SHORT[s]; if (!t) return;
+      var i = TASKS.indexOf(t); if (i >= 0) TASKS.splice(i, 1);
+      searchIndexRemove(t);
+      delete TASK_BY_SHORT[s]; delete INIT_MAIN_TAG[s]; delete INIT_PROJECT[s];
+      var n = nodeFor(s); if (n) n.remove();
+    });
+    (d.add || []).forEach(function(t){ TASKS.push(t); TASK_BY_SHORT[t.short] = t; searchIndexAdd(t); setInit(t); });
+    (d.modify || []).forEach(function(t){
+      var cur = TASK_BY_SHORT[t.short], oldProj = INIT_PROJECT[t.short], oldTag = INIT_MAIN_TAG[t.short];
+      if (cur){ Object.keys(t).forEach(function(k){ cur[k] = t[k]; }); } else { TASKS.push(t); TASK_BY_SHORT[t.short] = cur = t; searchIndexAdd(t); }
+      setInit(cur);
+      var n = nodeFor(t.short); if (n) syncNode(n, cur, oldProj, oldTag);
+    });
+    var gone = Object.create(null);
+    (d.edges_del || []).forEach(function(e){
+      link(PARENT_DEPS0, e[0], e[1], false); link(CHILD_TO_PARENTS, e[1], e[0], false); gone[e[0] + '>' + e[1]] = 1;
+    });
+    window.EXIST_EDGES = (window.EXIST_EDGES || []).filter(function(e){ return !gone[e.from + '>' + e.to]; });
+    (d.edges_add || []).forEach(function(e){
+      link(PARENT_DEPS0, e[0], e[1], true); link(CHILD_TO_PARENTS, e[1], e[0], true);
+      window.EXIST_EDGES.push({from: e[0], to: e[1]});
+    });
+    redraw();
+  };
+
+  window.refreshPayload = function(force){
+    if (busy || (!force && Date.now() - last < 2000)) return Promise.resolve(false);
+    busy = true; last = Date.now();
+    var headers = (etag && !force) ? {'If-None-Match': etag} : {};
+    return fetch('payload', {headers: headers, cache: 'no-store'}).then(function(r){
+      if (r.status === 304) return false;
+      if (!r.ok) throw new Error('HTTP ' + r.status);
+      etag = r.headers.get('ETag');
+      return r.json().then(function(D){
+        window.tcApplyData(D);
+        try{ window.showToast && window.showToast('Tasks refreshed (' + (D.tasks ? D.tasks.length : D.n) + ')'); }catch(_){}
+        return true;
+      });
+    }).catch(function(e){ console.log('[serve] refresh failed', e); return false; })
+      .then(function(v){ busy = false; return v; });
+  };
+
+  window.addEventListener('focus', function(){ if (!live) window.refreshPayload(); });
+  document.addEventListener('visibilitychange', function(){ if (!document.hidden && !live) window.refreshPayload(); });
+  setInterval(function(){ if (!document.hidden && !live) window.refreshPayload(); }, 15000);
+
+  if (typeof EventSource !== 'function') return;
+  var es = new EventSource('events');
+  // a missed delta (reconnect, or the stream started after the page was built) → full resync
+  es.addEventListener('hello', function(e){
+    live = true;
+    var s = JSON.parse(e.data).seq;
+    if (s !== seq) window.refreshPayload(true);
+    seq = s;
+  });
+  es.addEventListener('delta', function(e){
+    var d = JSON.parse(e.data);
+    if (d.seq !== seq + 1){ seq = d.seq; window.refreshPayload(true); return; }
+    seq = d.seq;
+    try{ window.tcApplyDelta(d); }catch(err){ console.log('[serve] delta failed', err); window.refreshPayload(true); }
+  });
+  es.onerror = function(){ live = false; };
+})();</script>
+"""
+
+def _extract_profile_arg(argv):
+    """Parse --profile / --profile=TRACE.json, return (trace_path or None, remaining_args)."""
+    path, out = None, []
+    for a in argv:
+        if a == "--profile":
+            path = OUT_HTML.with_name("TaskCanvas.trace.json")
+        elif a.startswith("--profile="):
+            path = Path(a.split("=", 1)[1]).expanduser()
+        else:
+            out.append(a)
+    return path, out
+
+def _extract_serve_args(argv):
+    """Parse --serve and --port=N, return (port or None, remaining_args)."""
+    flags, out = _extract_flags(argv, "--serve")
+    port, out = _extract_option(out, "--port")
+    if "--serve" not in flags:
+        return None, out
+    try:
+        return int(port or 8765), out
+    except ValueError:
+        eprint(f"[TaskCanvas] bad --port {port!r}; using 8765")
+        return 8765, out
+
+def serve_canvas(render, load_tasks, to_json, tasks, port=8765, files=None, interval=1.0):
+    """
+    --serve: serve the page at / on 127.0.0.1:port until Ctrl-C, with fresh data
+    at /payload (ETag / 304) and add/modify/delete/edge deltas pushed over SSE at
+    /events. A watcher polls the Taskwarrior fingerprint every `interval` s; only
+    a change re-runs load_tasks() and diffs against the previous snapshot
+    (which starts out as `tasks`, the ones embedded in the page).
+    render(tail) builds the page with extra end-of-body fragments; to_json(tasks,
+    shorts) builds the /payload body with the snapshot's shorts, so it keys tasks
+    the same way as the deltas. `files` maps extra names (e.g. the background)
+    to paths next to the page; the --assets bundle is added automatically.
+    """
+    import hashlib, mimetypes, queue, threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    files = dict(files or {})
+    lock = threading.Lock()
+    clients = set()
+    state = {"fp": None, "snap": task_snapshot(tasks), "seq": 0}
+
+    def set_body(tasks):
+        body = to_json(tasks, snapshot_shorts(state["snap"], tasks)).encode("utf-8")
+        state.update(body=body, etag='"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+
+    def refresh():
+        """Re-read the tasks if the fingerprint moved (every time without one); push the delta to every /events client."""
+        fp = _tw_fingerprint()
+        with lock:
+            if fp is not None and fp == state["fp"]:
+                return
+            tasks = load_tasks()
+            snap = task_snapshot(tasks, state["snap"])
+            delta = diff_snapshots(state["snap"], snap)
+            state.update(fp=fp, snap=snap)
+            set_body(tasks)
+            if delta is None:
+                return
+            state["seq"] += 1
+            delta["seq"] = state["seq"]
+            msg = "event: delta\ndata: " + json.dumps(delta, ensure_ascii=False) + "\n\n"
+            eprint(f"[TaskCanvas] delta #{state['seq']}: +{len(delta['add'])} ~{len(delta['modify'])} "
+                   f"-{len(delta['delete'])} edges +{len(delta['edges_add'])}/-{len(delta['edges_del'])}")
+            for q in list(clients):
+                q.put(msg)
+
+    def watch(stop):
+        while not stop.wait(interval):
+            try:
+                refresh()
+            except Exception as e:
+                eprint(f"[TaskCanvas] watcher: {e}")
+
+    set_body(tasks)
+    page = render([f"<script>window.__TC_PAYLOAD_ETAG__ = {json.dumps(state['etag'])}; window.__TC_SEQ__ = 0;</script>\n",
+                   SERVE_JS]).encode("utf-8")
+    files.update((p.name, p) for p in OUT_HTML.parent.glob("TaskCanvas.assets.*"))   # written by render()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, code, body=b"", ctype=None, **headers):
+            self.send_response(code)
+            if ctype:
+                self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            for k, v in headers.items():
+                self.send_header(k.replace("_", "-"), v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/" + OUT_HTML.name):
+                return self._send(200, page, "text/html; charset=utf-8")
+            if path == "/payload":
+                try:
+                    refresh()
+                except Exception as e:
+                    eprint(f"[TaskCanvas] payload failed: {e}")
+                    return self._send(500, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+                with lock:
+                    etag, body = state["etag"], state["body"]
+                if etag in (self.headers.get("If-None-Match") or ""):
+                    return self._send(304, ETag=etag)
+                return self._send(200, body, "application/json", ETag=etag)
+            if path == "/events":
+                return self._events()
+            p = files.get(path.lstrip("/"))
+            if p is not None and p.is_file():
+                ctype = mimetypes.guess_type(p.name)[0] or "application/octet-stream"
+                return self._send(200, p.read_bytes(), ctype)
+            return self._send(404, b"not found", "text/plain")
+
+        do_HEAD = do_GET
+
+        def _events(self):
+            q = queue.Queue()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            with lock:
+                clients.add(q)
+                q.put(f"event: hello\ndata: {json.dumps({'seq': state['seq']})}\n\n")
+            try:
+                while True:
+                    try:
+                        msg = q.get(timeout=15)
+                    except queue.Empty:
+                        msg = ": ping\n\n"        # keep-alive; also detects closed tabs
+                    self.wfile.write(msg.encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+            finally:
+                clients.discard(q)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    httpd.daemon_threads = True
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(stop,), daemon=True).start()
+    print(f"Serving TaskCanvas at {url} (Ctrl-C to stop)")
+    open_file(url)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        httpd.server_close()
+
+def _initial_projects(args, load_tasks):
+    """Projects to place at start: --selector picks (over load_tasks()) then positional args."""
+    init_projects = []
+    if any(a == "--selector" for a in args):
+        try:
+            init_projects = run_project_selector(load_tasks())
+        except Exception as e:
+            print(f"[selector] error: {e}")
+
+    extra = [a for a in args if a and not a.startswith("-")]
+    if extra:
+        seen = set(init_projects)
+        for p in extra:
+            if p not in seen:
+                init_projects.append(p); seen.add(p)
+    return init_projects
+
+def main():
+    global PROFILE
+    raw_args = sys.argv[1:]
+    trace_path, raw_args = _extract_profile_arg(raw_args)
+    if trace_path:
+        PROFILE = _Profile()
+    filter_str, args_wo_filter = _extract_filter_arg(raw_args)
+    use_cache, clear, args_wo_filter = _extract_cache_args(args_wo_filter)
+    backend, args_wo_filter = _extract_backend_arg(args_wo_filter)
+    flags, args_wo_filter = _extract_flags(args_wo_filter, "--columnar", "--compress", "--assets")
+    fields_arg, args_wo_filter = _extract_option(args_wo_filter, "--fields")
+    fields = [f.strip() for f in (fields_arg or "").split(",") if f.strip()]
+    serve_port, args_wo_filter = _extract_serve_args(args_wo_filter)
+    hook_flags, args_wo_filter = _extract_flags(args_wo_filter, "--install-hook", "--uninstall-hook")
+    if hook_flags:
+        install_hook(remove="--uninstall-hook" in hook_flags)
+        return
+    apply_src, args_wo_filter = _extract_option(args_wo_filter, "--apply")
+    if apply_src is not None:
+        dry, _ = _extract_flags(args_wo_filter, "--dry-run")
+        text = sys.stdin.read() if apply_src in ("", "-") else Path(apply_src).read_text(encoding="utf-8")
+        sys.exit(apply_commands(text, dry_run="--dry-run" in dry))
+    if clear:
+        eprint(f"[TaskCanvas] Cleared {clear_cache()} cache file(s)")
+
+    # --scope: the projects are known up front and only they (plus their
+    # dependency closure) are loaded; the selector still needs the full list.
+    scope, args_wo_filter = _extract_flags(args_wo_filter, "--scope")
+    init_projects = None
+    if scope:
+        init_projects = _initial_projects(args_wo_filter, lambda: fetch_tasks_cached(use_cache, 30, backend, fields))
+        if not init_projects:
+            eprint("[TaskCanvas] --scope needs projects (positional or --selector); loading all pending tasks")
+            scope = []
+
+    # 1) Load ALL pending tasks for the payload (drawer/search, etc.).
+    # 2) If filter is present, capture just the UUIDs to auto-place: evaluate it
+    #    locally over tasks_all, and only export again for unsupported terms.
+    #    Independent queries run concurrently.
+    pred = compile_filter(filter_str) if filter_str else None
+    if scope:
+        queries = {"pending": (fetch_tasks_scoped, init_projects, 30, fields)}
+    else:
+        queries = {"pending": (fetch_tasks_cached, use_cache, 30, backend, fields)}
+    if filter_str and pred is None:
+        queries["filter"] = (fetch_tasks, filter_str)
+    with profile_span("load tasks"):
+        results = run_queries(queries)
+    tasks_all = results["pending"]
+
+    init_task_uuids = []
+    if pred is not None:
+        init_task_uuids = [t["uuid"] for t in tasks_all if pred(t)]
+        eprint(f"[TaskCanvas] Filter matched {len(init_task_uuids)} task(s) locally (filter: {filter_str!r})")
+    elif filter_str:
+        init_task_uuids = [t["uuid"] for t in results["filter"]]
+
+    # 3) Build payload using *all* tasks
+    build = build_payload_columnar if "--columnar" in flags else build_payload
+    with profile_span(build.__name__):
+        payload = build(tasks_all)
+    with profile_span("build_field_chunks"):
+        field_chunks = build_field_chunks(tasks_all) if fields else []
+    if fields:
+        payload["fields"] = {"names": fields, "chunk": FIELD_CHUNK, "count": len(field_chunks)}
+
+    # 4) Merge selector/positional args (these are still supported)
+    if init_projects is None:
+        init_projects = _initial_projects(args_wo_filter, lambda: tasks_all)
+
+    # 5) Store initial placements into payload
+    if init_projects:
+        payload["init_projects"] = init_projects
+    if init_task_uuids:
+        payload["init_task_uuids"] = init_task_uuids 
 
     # Parse bg flags out of the leftover args:
     bg_arg, bg_opacity, args_wo_filter = _extract_bg_args(args_wo_filter)
 
+    head = []
     bg_path = _find_bg_file(bg_arg)
     if bg_path:
-        html = inject_custom_background(html, bg_path, bg_opacity)
-        print(f"[TaskCanvas] Using background: {bg_path.name}")
+        try:
+            with profile_span("inject_custom_background", "inject"):
+                head.append(custom_background_css(bg_path, bg_opacity) + "\n")
+            print(f"[TaskCanvas] Using background: {bg_path.name}")
+        except Exception as e:
+            eprint(f"[TaskCanvas] custom bg inject failed: {e}")
     else:
         eprint("[TaskCanvas] No custom bg found. Put 'taskcanvas-bg.(jpg|png|webp|svg)' next to the script or pass --bg=FILE.")
 
-
-    
-    OUT_HTML.write_text(html, encoding="utf-8")
+    page_kw = dict(field_chunks=field_chunks, compress="--compress" in flags, head=head,
+                   use_cache=use_cache, assets="--assets" in flags)
+    if serve_port is not None:
+        with profile_span("_json_text"):
+            json_text = _json_text(payload)
+        render = lambda tail=(): render_page(json_text, tail=tail, **page_kw)
+        if scope:
+            load = lambda: fetch_tasks_scoped(init_projects, 30, fields)
+        else:
+            load = lambda: fetch_tasks_cached(use_cache, 30, backend, fields)
+        to_json = lambda tasks, shorts: _json_text(build(tasks, shorts))
+        files = {}
+        if bg_path:
+            files[bg_path.name] = OUT_HTML.parent / bg_path.name
+        write_profile(trace_path)
+        serve_canvas(render, load, to_json, tasks_all, serve_port, files)
+        return
+
+    # Payload is serialized straight into the file (no json_text / html copies)
+    with profile_span("write_page"):
+        write_page(OUT_HTML, payload, **page_kw)
+    eprint(f"[TaskCanvas] Embedded tasks: {len(tasks_all)}")
     print(f"Wrote {OUT_HTML}")
-    open_file(OUT_HTML)
+    with profile_span("open_file"):
+        open_file(OUT_HTML)
+    write_profile(trace_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
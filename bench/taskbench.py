@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TaskCanvas benchmark harness.
+
+Generates a synthetic Taskwarrior export (configurable size, projects, tags and
+dependency DAG shape), puts a stand-in `task` executable first on PATH that
+replays it, and times each stage of the TaskCanvas pipeline:
+
+  fetch_tasks        subprocess + streaming parse + normalization
+  _parse_task_export parse of the raw export text alone
+  build_payload      payload dict (plain, and columnar)
+  json_text          payload serialization
+  render_page        cached static shell + payload (first repeat also builds the shell)
+  write              write of the rendered page
+  write_page         streamed page write from the payload dict (what main() does)
+  import (cold/warm) `python -X importtime -c "import TaskCanvas"` in a fresh
+                     interpreter, without bytecode (what every `python3
+                     TaskCanvas.py` run pays to compile the script) and from .pyc
+
+Timings come from a clean pass; memory from a second pass under tracemalloc
+(Python heap peak per stage) so tracing overhead doesn't skew the times.
+Results are written as JSON; --compare flags stages that regressed.
+
+  python3 bench/taskbench.py --tasks 20000 --out bench-20k.json
+  python3 bench/taskbench.py --tasks 20000 --compare bench-20k.json
+"""
+
+import argparse, json, os, platform, random, resource, statistics, subprocess, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import TaskCanvas as tc  # noqa: E402
+
+
+# ======================= Synthetic export =====================
+
+def generate_export(n=2000, projects=20, tags_per_task=2, dep_density=0.5, chain_depth=6, seed=1):
+    """
+    Export rows shaped like `task export` output. Tasks are spread over
+    `chain_depth` levels; each task above level 0 depends on ~dep_density tasks
+    of the level below, so the longest dependency chain is chain_depth long.
+    """
+    rnd = random.Random(seed)
+    proj_names = [f"Proj{p:03d}" + (f".Sub{p % 7}" if p % 3 == 0 else "") for p in range(projects)]
+    tag_pool = [f"tag{i:02d}" for i in range(max(4, tags_per_task * 8))]
+    levels = [[] for _ in range(max(1, chain_depth))]
+    rows = []
+    for i in range(n):
+        h = f"{rnd.getrandbits(128):032x}"
+        uuid = f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        row = {
+            "id": i + 1,
+            "uuid": uuid,
+            "description": f"Synthetic task {i} " + " ".join(rnd.choice(("fix", "plan", "call", "write", "review", "ship")) for _ in range(3)),
+            "status": "pending",
+            "entry": "20250101T090000Z",
+            "modified": "20250102T090000Z",
+            "urgency": round(rnd.uniform(0, 15), 4),
+        }
+        if rnd.random() < 0.95:
+            row["project"] = rnd.choice(proj_names)
+        k = min(len(tag_pool), max(0, int(rnd.gauss(tags_per_task, 1))))
+        if k:
+            row["tags"] = rnd.sample(tag_pool, k)
+        if rnd.random() < 0.3:
+            row["due"] = f"2026{rnd.randint(1, 12):02d}{rnd.randint(1, 28):02d}T170000Z"
+        if rnd.random() < 0.1:
+            row["annotations"] = [{"entry": "20250103T090000Z", "description": "note " * rnd.randint(1, 20)}]
+        lvl = rnd.randrange(len(levels))
+        below = levels[lvl - 1] if lvl else []
+        if below:
+            want = int(dep_density) + (1 if rnd.random() < dep_density - int(dep_density) else 0)
+            deps = {rnd.choice(below) for _ in range(want)}
+            if deps:
+                row["depends"] = sorted(deps)
+        levels[lvl].append(uuid)
+        rows.append(row)
+    return rows
+
+def install_fake_task(bin_dir, export_path):
+    """Write a stand-in `task` that replays export_path for any arguments; prepend it to PATH."""
+    bin_dir = Path(bin_dir)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    exe = bin_dir / "task"
+    exe.write_text(f'#!/bin/sh\nexec cat "{export_path}"\n', encoding="utf-8")
+    exe.chmod(0o755)
+    os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ.get("PATH", "")
+    return exe
+
+
+# ======================= Stages =====================
+
+def _stages(raw, out_path):
+    """Ordered (name, fn) pairs; each fn gets the previous stage results dict."""
+    return [
+        ("fetch_tasks", lambda r: tc.fetch_tasks(None)),
+        ("_parse_task_export", lambda r: tc._parse_task_export(raw)),
+        ("build_payload", lambda r: tc.build_payload(r["fetch_tasks"])),
+        ("build_payload_columnar", lambda r: tc.build_payload_columnar(r["fetch_tasks"])),
+        ("json_text", lambda r: tc._json_text(r["build_payload"])),
+        ("render_page", lambda r: tc.render_page(r["json_text"])),
+        ("write", lambda r: out_path.write_text(r["render_page"], encoding="utf-8")),
+        ("write_page", lambda r: tc.write_page(out_path, r["build_payload"])),
+    ]
+
+def _quiet():
+    """Silence TaskCanvas' stderr/stdout logging while a stage runs."""
+    import contextlib, io
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    return stack
+
+def run_bench(raw, out_path, repeat=3, memory=True):
+    stages = _stages(raw, out_path)
+    times = {name: [] for name, _ in stages}
+    rss = {}
+    for _ in range(repeat):
+        res = {}
+        for name, fn in stages:
+            with _quiet():
+                t0 = time.perf_counter()
+                res[name] = fn(res)
+                times[name].append(time.perf_counter() - t0)
+            rss[name] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peaks = {}
+    if memory:
+        res = {}
+        tracemalloc.start()
+        for name, fn in stages:
+            tracemalloc.reset_peak()
+            with _quiet():
+                res[name] = fn(res)
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    out = {}
+    for name, _ in stages:
+        ts = times[name]
+        out[name] = {"runs": ts, "median": statistics.median(ts), "min": min(ts),
+                     "rss_hwm_kb": rss[name], "py_peak_bytes": peaks.get(name)}
+    return out
+
+def _importtime(env, *pyflags):
+    """Cumulative µs of the TaskCanvas line of one `-X importtime` run."""
+    r = subprocess.run([sys.executable, *pyflags, "-X", "importtime", "-c", "import TaskCanvas"],
+                       cwd=str(ROOT), env=env, capture_output=True, text=True, check=True)
+    for line in r.stderr.splitlines():
+        if line.rstrip().endswith("| TaskCanvas"):
+            return int(line.split("|")[1])
+    raise RuntimeError("TaskCanvas missing from -X importtime output")
+
+def run_import_bench(repeat=5):
+    """Import cost of TaskCanvas in fresh interpreters, cold (compile from source) and warm (.pyc)."""
+    out = {}
+    with tempfile.TemporaryDirectory(prefix="taskbench-pyc-") as prefix:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=prefix)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        _importtime(env)                                          # populate .pyc files (stdlib included)
+        warm = [_importtime(env) for _ in range(repeat)]
+        for pyc in Path(prefix).rglob("TaskCanvas.*.pyc"):
+            pyc.unlink()
+        cold = [_importtime(env, "-B") for _ in range(repeat)]   # -B: not re-written, every run compiles
+    for name, us in (("import (cold)", cold), ("import (warm)", warm)):
+        ts = [u / 1e6 for u in us]
+        out[name] = {"runs": ts, "median": statistics.median(ts), "min": min(ts),
+                     "rss_hwm_kb": None, "py_peak_bytes": None}
+    return out
+
+def compare(current, baseline, threshold):
+    """Print per-stage median ratios vs a previous result file; return the regressed stage names."""
+    regressed = []
+    print(f"{'stage':<24}{'base':>10}{'now':>10}{'ratio':>8}")
+    for name, cur in current["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old:
+            continue
+        ratio = cur["median"] / old["median"] if old["median"] else float("inf")
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:<24}{old['median']:>10.4f}{cur['median']:>10.4f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the TaskCanvas pipeline against a synthetic export.")
+    ap.add_argument("--tasks", type=int, default=2000)
+    ap.add_argument("--projects", type=int, default=20)
+    ap.add_argument("--tags", type=int, default=2, help="mean tags per task")
+    ap.add_argument("--dep-density", type=float, default=0.5, help="mean dependencies per task (above level 0)")
+    ap.add_argument("--chain-depth", type=int, default=6, help="dependency DAG depth")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--no-import", action="store_true", help="skip the -X importtime check")
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--compare", help="previous results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    ap.add_argument("--write-export", help="only write the synthetic export JSON to this path and exit")
+    args = ap.parse_args(argv)
+
+    rows = generate_export(args.tasks, args.projects, args.tags, args.dep_density, args.chain_depth, args.seed)
+    raw = json.dumps(rows, ensure_ascii=False)
+    if args.write_export:
+        Path(args.write_export).write_text(raw, encoding="utf-8")
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="taskbench-") as tmp:
+        tmp = Path(tmp)
+        export_path = tmp / "export.json"
+        export_path.write_text(raw, encoding="utf-8")
+        install_fake_task(tmp / "bin", export_path)
+        tc.CACHE_DIR = tmp / "cache"          # keep the shell cache out of the user's dirs
+        stages = run_bench(raw, tmp / "TaskCanvas.html", args.repeat, not args.no_memory)
+    if not args.no_import:
+        stages.update(run_import_bench(max(args.repeat, 5)))
+
+    result = {
+        "params": {k: getattr(args, k) for k in ("tasks", "projects", "tags", "dep_density", "chain_depth", "seed", "repeat")},
+        "export_bytes": len(raw.encode("utf-8")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": stages,
+    }
+    text = json.dumps(result, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    elif not args.compare:
+        print(text)
+
+    for name, st in stages.items():
+        peak = st["py_peak_bytes"]
+        peak_s = f"{peak / 1e6:8.1f} MB" if peak is not None else "       -"
+        rss_s = f"{st['rss_hwm_kb'] / 1024:7.1f} MB" if st["rss_hwm_kb"] is not None else "      -"
+        print(f"[bench] {name:<24}{st['median'] * 1000:9.1f} ms  py-peak {peak_s}  rss-hwm {rss_s}",
+              file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(result, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
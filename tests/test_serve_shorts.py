@@ -0,0 +1,44 @@
+"""--serve: the /payload body and the SSE deltas must key tasks by the same short ids."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import TaskCanvas as tc  # noqa: E402
+
+A = "abcdef12-aaaa-4aaa-8aaa-aaaaaaaaaaaa"
+B = "abcdef12-bbbb-4bbb-8bbb-bbbbbbbbbbbb"
+
+
+def task(uuid, desc, depends=()):
+    return {"uuid": uuid, "desc": desc, "project": "P", "tags": [], "depends": list(depends), "due": None}
+
+
+class ServeShortsTest(unittest.TestCase):
+    def setUp(self):
+        # A is embedded in the page alone, then B arrives with the same 8-hex prefix
+        self.snap0 = tc.task_snapshot([task(A, "a")])
+        self.tasks = [task(A, "a"), task(B, "b", [A])]
+        self.snap1 = tc.task_snapshot(self.tasks, self.snap0)
+
+    def test_snapshot_keeps_existing_short(self):
+        self.assertEqual(tc.snapshot_shorts(self.snap1, self.tasks), ["abcdef12", "abcdef12b"])
+
+    def test_payload_uses_snapshot_shorts(self):
+        shorts = tc.snapshot_shorts(self.snap1, self.tasks)
+        plain = tc.build_payload(self.tasks, shorts)
+        self.assertEqual([t["short"] for t in plain["tasks"]], shorts)
+        columnar = tc.build_payload_columnar(self.tasks, shorts)
+        self.assertEqual(columnar["shorts"], {"1": "abcdef12b"})   # index 0 stays the 8-digit default
+
+    def test_later_delta_matches_payload(self):
+        shorts = tc.snapshot_shorts(self.snap1, self.tasks)
+        delta = tc.diff_snapshots(self.snap1, tc.task_snapshot([task(B, "b")], self.snap1))
+        self.assertEqual(delta["delete"], [shorts[0]])
+        self.assertEqual(delta["edges_del"], [(shorts[1], shorts[0])])
+
+
+if __name__ == "__main__":
+    unittest.main()